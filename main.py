@@ -1,15 +1,27 @@
 import sys
 import os
-import numpy as np
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QLabel
-from PyQt5.QtCore import Qt, QTimer, QSize
+
+# 启动时间线需最先导入，以便记录后续各模块的导入耗时
+from modules.startup import timeline
+if "--profile-startup" in sys.argv or os.environ.get("BLACKHOLE_PROFILE_STARTUP"):
+    timeline.enable()
+
+# 性能遥测日志：--telemetry PATH 或环境变量 BLACKHOLE_TELEMETRY
+from modules.telemetry import telemetry, params_hash
+
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QLabel,
+                             QFileDialog)
+from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QIcon, QPixmap
+timeline.mark("导入 PyQt5")
 
-# 导入自定义模块
+# 导入自定义模块（监控面板依赖 pyqtgraph，首次显示时才导入）
 from modules.controls import ControlPanel
 from modules.renderer import BlackHoleRenderer
-from modules.monitor import MonitorPanel
 from modules.simulation import BlackHoleSimulator
+from modules.lazy_panel import LazyPanel
+from modules.scheduler import FrameScheduler
+timeline.mark("导入核心模块")
 
 # 确保资源路径正确
 def resource_path(relative_path):
@@ -38,6 +50,7 @@ class BlackHoleVisualizer(QMainWindow):
         
         # 创建黑洞模拟器核心
         self.simulator = BlackHoleSimulator()
+        timeline.mark("创建模拟器")
         
         # 创建主布局
         main_widget = QWidget()
@@ -49,34 +62,113 @@ class BlackHoleVisualizer(QMainWindow):
         control_panel.setObjectName("controlPanel")
         control_panel.setFixedWidth(400)
         main_layout.addWidget(control_panel)
+        self.control_panel = control_panel
+        timeline.mark("创建控制面板")
         
         # 右侧区域
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
         right_layout.setContentsMargins(0, 0, 0, 0)
         
-        # 顶部渲染窗口
+        # 顶部渲染窗口（单视角 / 多视角）
+        self.render_tabs = QTabWidget()
         self.renderer = BlackHoleRenderer(self.simulator, self)
-        right_layout.addWidget(self.renderer, 4)
+        self.render_tabs.addTab(self.renderer, "单视角")
+        self.multiview_panel = LazyPanel(self.create_multiview_panel, "多视角渲染加载中...", self)
+        self.multiview_panel.panelCreated.connect(self.on_multiview_created)
+        self.render_tabs.addTab(self.multiview_panel, "多视角")
+        right_layout.addWidget(self.render_tabs, 4)
+        timeline.mark("创建渲染窗口")
         
-        # 底部监控窗口
-        monitor_panel = MonitorPanel(self.simulator, self)
-        monitor_panel.setFixedHeight(300)
-        right_layout.addWidget(monitor_panel)
+        # 底部监控窗口（延迟创建）
+        self.monitor_panel = LazyPanel(self.create_monitor_panel, "监控面板加载中...", self)
+        self.monitor_panel.setFixedHeight(300)
+        self.monitor_panel.panelCreated.connect(self.on_monitor_created)
+        # 监控面板启动时即可见：等首个真实帧绘制后再导入 pyqtgraph，避免阻塞首次绘制
+        self.monitor_panel.wait_for(self.renderer.firstFramePainted)
+        right_layout.addWidget(self.monitor_panel)
         
         main_layout.addWidget(right_panel, 1)
         
         self.setCentralWidget(main_widget)
         
-        # 状态计时器
-        self.status_timer = QTimer(self)
-        self.status_timer.timeout.connect(self.update_status)
-        self.status_timer.start(1000)
+        # 统一帧调度器：渲染动画 10 FPS，观测量 20 Hz，状态栏 1 Hz
+        self.scheduler = FrameScheduler(self)
+        self.scheduler.register("render", self.renderer.update_render, 100,
+                                priority=10, busy=self.renderer.is_rendering)
+        self.scheduler.register("observables", self.update_observables, 50, priority=8)
+        self.scheduler.register("status", self.update_status, 1000, priority=0)
+        self.scheduler.watch(self)
+        self.scheduler.start()
         
         # 参数更新连接
         control_panel.parametersChanged.connect(self.simulator.set_params)
         control_panel.parametersChanged.connect(self.renderer.update_simulation)
-        control_panel.parametersChanged.connect(monitor_panel.update_monitor)
+        control_panel.displayChannelChanged.connect(self.renderer.set_display_channel)
+        control_panel.antialiasChanged.connect(self.renderer.set_antialias)
+        control_panel.bandsChanged.connect(self.renderer.set_bands)
+        control_panel.exportBandsRequested.connect(self.export_band_stack)
+        
+        # 遥测：记录会话初始状态和参数变化事件流，供 modules.replay 回放
+        control_panel.parametersChanged.connect(self.record_params)
+        control_panel.displayChannelChanged.connect(lambda channel: self.record_display())
+        control_panel.antialiasChanged.connect(lambda enabled: self.record_display())
+        self.record_session()
+    
+    def create_monitor_panel(self, parent):
+        """导入并创建监控面板"""
+        from modules.monitor import MonitorPanel
+        timeline.mark("导入监控模块 (pyqtgraph)")
+        return MonitorPanel(self.simulator, parent)
+    
+    def on_monitor_created(self, monitor_panel):
+        """监控面板创建后连接参数更新"""
+        self.control_panel.parametersChanged.connect(monitor_panel.update_monitor)
+        self.scheduler.register("monitor", monitor_panel.update_monitor, 500, priority=5)
+        self.scheduler.register("light_curve", monitor_panel.update_light_curve, 100, priority=6)
+        timeline.mark("创建监控面板")
+    
+    def create_multiview_panel(self, parent):
+        """导入并创建多视角面板"""
+        from modules.multiview_panel import MultiViewPanel
+        return MultiViewPanel(self.simulator, self.renderer, parent)
+    
+    def on_multiview_created(self, multiview_panel):
+        """多视角面板创建后加入调度（面板不可见时暂停）"""
+        self.scheduler.register("multiview", multiview_panel.refresh, 500, priority=4,
+                                busy=multiview_panel.is_rendering, visible=multiview_panel.isVisible)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        timeline.mark("窗口显示")
+    
+    def closeEvent(self, event):
+        self.scheduler.stop()
+        self.renderer.shutdown()
+        if self.multiview_panel.panel is not None:
+            self.multiview_panel.panel.shutdown()
+        telemetry.record('session_end', frames=self.renderer.frame_index)
+        telemetry.close()
+        super().closeEvent(event)
+    
+    def record_session(self):
+        """记录会话开始时的模拟参数与渲染设置"""
+        params = self.simulator.get_params()
+        telemetry.record('session', params=params, param_hash=params_hash(params),
+                         resolution=self.renderer.resolution, zoom=self.renderer.zoom,
+                         view_angle=self.renderer.view_angle, time_step=self.renderer.time_step,
+                         display_channel=self.renderer.display_channel,
+                         antialias=self.renderer.antialias)
+    
+    def record_params(self, params):
+        """记录 ControlPanel.parametersChanged 事件"""
+        telemetry.record('params', params=params, param_hash=params_hash(self.simulator.get_params()),
+                         sim_time=self.simulator.time)
+    
+    def record_display(self):
+        """记录显示通道与抗锯齿设置的变化"""
+        telemetry.record('display', display_channel=self.renderer.display_channel,
+                         antialias=self.renderer.antialias)
     
     def load_style_sheet(self):
         """加载样式表"""
@@ -98,13 +190,41 @@ class BlackHoleVisualizer(QMainWindow):
                 }
             """)
     
+    def export_band_stack(self):
+        """把最近一帧的多波段堆叠保存为 .npz"""
+        if self.renderer.band_stack is None:
+            self.status_label.setText("尚无波段数据：请先选择一个波段或勾选“输出全部波段堆叠”")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出波段堆叠", "bands.npz", "NumPy 压缩包 (*.npz)")
+        if path:
+            self.renderer.export_bands(path)
+    
+    def update_observables(self):
+        """以高于渲染的频率计算观测量并写入观测数据环"""
+        self.simulator.measure_observables(self.renderer.view_angle, self.renderer.zoom)
+    
     def update_status(self):
         """更新状态栏信息"""
         status = f"黑洞质量: {self.simulator.black_hole_mass:.1e} M☉ | 视界半径: {self.simulator.event_horizon_radius:.1f} km | 温度: {self.simulator.accretion_disk_temp:.1e} K"
         self.status_label.setText(status)
 
-if __name__ == "__main__":
+def telemetry_path(argv):
+    """从命令行 (--telemetry PATH) 或环境变量获取遥测日志路径"""
+    if "--telemetry" in argv:
+        index = argv.index("--telemetry")
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return os.environ.get("BLACKHOLE_TELEMETRY")
+
+def main():
+    path = telemetry_path(sys.argv)
+    if path:
+        telemetry.enable(path)
+    
     app = QApplication(sys.argv)
+    # 缓存目录等按应用名区分，不随启动脚本名变化
+    app.setApplicationName("blackhole-visualizer")
+    timeline.mark("创建 QApplication")
     
     # 设置应用ID以实现Windows任务栏独立图标
     try:
@@ -119,5 +239,10 @@ if __name__ == "__main__":
     app.setFont(font)
     
     window = BlackHoleVisualizer()
+    timeline.mark("创建主窗口")
     window.show()
     sys.exit(app.exec_())
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,76 @@
+import numpy as np
+
+# 波段着色器注册表：名称 -> shader(simulator, geometry) -> 强度图
+BAND_SHADERS = {}
+
+# X 射线波段的光子能量对应的温度 E/k (1 keV)
+XRAY_TEMPERATURE = 1.16e7
+
+
+def band(name):
+    """注册波段着色器的装饰器"""
+    def register(shader):
+        BAND_SHADERS[name] = shader
+        return shader
+    return register
+
+
+@band('bolometric')
+def shade_bolometric(simulator, geometry):
+    """热辐射总强度：观测到的 T^4 再乘以红移因子 g^4"""
+    g = geometry['doppler']
+    return geometry['intensity'] * geometry['lens_intensity'] * g ** 4
+
+
+@band('xray')
+def shade_xray(simulator, geometry):
+    """X 射线（维恩尾）：I ∝ 1 / (exp(E / k g T) - 1)，对温度和红移极其敏感"""
+    g_temp = np.maximum(geometry['doppler'] * geometry['temp'], 1.0)
+    intensity = 1.0 / np.expm1(np.minimum(XRAY_TEMPERATURE / g_temp, 700.0))
+    return np.where(geometry['in_disk'], intensity * geometry['modulation'] * geometry['lens_intensity'], 0.0)
+
+
+@band('radio')
+def shade_radio(simulator, geometry):
+    """射电（瑞利-金斯极限）：I ∝ g T"""
+    g_temp = geometry['doppler'] * geometry['ratio']
+    return np.where(geometry['in_disk'], g_temp * geometry['modulation'] * geometry['lens_intensity'], 0.0)
+
+
+@band('redshift')
+def shade_redshift(simulator, geometry):
+    """红移因子 g 图，盘外为 0"""
+    return np.where(geometry['in_disk'], geometry['doppler'], 0.0)
+
+
+def shade_bands(simulator, geometry, names):
+    """用同一组几何中间量为每个请求的波段着色
+    :return: 形状为 geometry 形状 + (len(names),) 的 float32 通道堆叠数组
+    """
+    shape = geometry['weight'].shape
+    stack = np.empty(shape + (len(names),), dtype=np.float32)
+    for i, name in enumerate(names):
+        stack[..., i] = BAND_SHADERS[name](simulator, geometry)
+    return stack
+
+
+# 显示单个波段时使用的伪彩色（黑-紫-红-黄-白）
+_COLORMAP = np.array([
+    [0, 0, 0],
+    [80, 20, 120],
+    [200, 40, 60],
+    [250, 180, 40],
+    [255, 255, 230],
+], dtype=np.float64)
+
+
+def colorize(channel):
+    """把单个波段归一化后映射为 uint8 伪彩色图像，0 值保持黑色（透明）"""
+    peak = channel.max()
+    if peak <= 0:
+        return np.zeros(channel.shape + (3,), dtype=np.uint8)
+    t = np.clip(channel / peak, 0.0, 1.0) * (len(_COLORMAP) - 1)
+    anchors = np.arange(len(_COLORMAP))
+    rgb = np.stack([np.interp(t, anchors, _COLORMAP[:, c]) for c in range(3)], axis=-1)
+    rgb[channel <= 0] = 0
+    return rgb.astype(np.uint8)
@@ -1,11 +1,24 @@
-import numpy as np
+from math import log10
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QGridLayout, 
                             QLabel, QSlider, QDoubleSpinBox, QPushButton,
-                            QComboBox)
+                            QComboBox, QCheckBox)
 from PyQt5.QtCore import Qt, pyqtSignal
 
 class ControlPanel(QWidget):
     parametersChanged = pyqtSignal(dict)
+    displayChannelChanged = pyqtSignal(str)
+    antialiasChanged = pyqtSignal(bool)
+    bandsChanged = pyqtSignal(object)
+    exportBandsRequested = pyqtSignal()
+    
+    # 显示通道：(显示名称, 渲染器通道名)
+    DISPLAY_CHANNELS = [
+        ("可见光 (RGB)", 'rgb'),
+        ("热辐射总强度", 'bolometric'),
+        ("X射线", 'xray'),
+        ("射电", 'radio'),
+        ("红移因子 g", 'redshift'),
+    ]
     
     def __init__(self, simulator, parent=None):
         super().__init__(parent)
@@ -157,6 +170,26 @@ class ControlPanel(QWidget):
         
         layout.addWidget(light_group)
         
+        # 显示通道
+        channel_group = QGroupBox("显示通道")
+        channel_layout = QGridLayout(channel_group)
+        channel_layout.addWidget(QLabel("波段:"), 0, 0)
+        self.channel_combo = QComboBox()
+        self.channel_combo.addItems([label for label, _ in self.DISPLAY_CHANNELS])
+        self.channel_combo.currentIndexChanged.connect(self.on_channel_change)
+        channel_layout.addWidget(self.channel_combo, 0, 1)
+        self.antialias_check = QCheckBox("自适应抗锯齿")
+        self.antialias_check.setChecked(True)
+        self.antialias_check.toggled.connect(self.antialiasChanged.emit)
+        channel_layout.addWidget(self.antialias_check, 1, 0, 1, 2)
+        self.bands_check = QCheckBox("输出全部波段堆叠")
+        self.bands_check.toggled.connect(self.on_bands_toggle)
+        channel_layout.addWidget(self.bands_check, 2, 0, 1, 2)
+        self.export_bands_btn = QPushButton("导出波段堆叠")
+        self.export_bands_btn.clicked.connect(self.exportBandsRequested.emit)
+        channel_layout.addWidget(self.export_bands_btn, 3, 0, 1, 2)
+        layout.addWidget(channel_group)
+        
         # 预设按钮
         self.presets_combo = QComboBox()
         self.presets_combo.addItems(["银河系中心", "M87中心", "天鹅座-X1", "自定义"])
@@ -225,6 +258,15 @@ class ControlPanel(QWidget):
         }
         self.parametersChanged.emit(params)
     
+    def on_channel_change(self, index):
+        """切换渲染显示的波段"""
+        self.displayChannelChanged.emit(self.DISPLAY_CHANNELS[index][1])
+    
+    def on_bands_toggle(self, enabled):
+        """每帧输出全部波段（非 RGB 通道）或只输出显示的波段"""
+        names = [name for _, name in self.DISPLAY_CHANNELS if name != 'rgb']
+        self.bandsChanged.emit(tuple(names) if enabled else ())
+    
     def apply_preset(self, index):
         """应用的预设参数"""
         presets = {
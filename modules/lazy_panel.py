@@ -0,0 +1,62 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+
+class LazyPanel(QWidget):
+    """占位面板 - 首次显示时才导入并创建真正的面板
+    
+    factory(parent) 负责导入重量级模块（如 pyqtgraph）并返回面板控件。
+    wait_for(signal) 可把创建推迟到某个信号（如渲染器首帧绘制完成）之后。
+    """
+    panelCreated = pyqtSignal(object)
+    
+    def __init__(self, factory, placeholder_text="加载中...", parent=None):
+        super().__init__(parent)
+        self._factory = factory
+        self._pending = False
+        self._gated = False
+        self.panel = None
+        
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        
+        self._placeholder = QLabel(placeholder_text)
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        self._layout.addWidget(self._placeholder)
+    
+    def wait_for(self, signal):
+        """在 signal 触发之前不创建真正的面板"""
+        self._gated = True
+        signal.connect(self._open_gate)
+    
+    def _open_gate(self, *args):
+        if not self._gated:
+            return
+        self._gated = False
+        if self.isVisible():
+            self.schedule_creation()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._gated:
+            self.schedule_creation()
+    
+    def schedule_creation(self):
+        """在下一次事件循环中创建真正的面板"""
+        if self.panel is None and not self._pending:
+            self._pending = True
+            QTimer.singleShot(0, self.create_panel)
+    
+    def create_panel(self):
+        """创建真正的面板并替换占位标签"""
+        if self.panel is not None:
+            return self.panel
+        
+        self.panel = self._factory(self)
+        self._layout.removeWidget(self._placeholder)
+        self._placeholder.deleteLater()
+        self._placeholder = None
+        self._layout.addWidget(self.panel)
+        
+        self.panelCreated.emit(self.panel)
+        return self.panel
@@ -1,6 +1,6 @@
 import numpy as np
 import pyqtgraph as pg
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSizePolicy
 from PyQt5.QtCore import Qt
 
 class TitleLabel(QLabel):
@@ -17,13 +17,8 @@ class MonitorPanel(QWidget):
         self.simulator = simulator
         self.setObjectName("monitorPanel")
         
-        # 初始化界面
+        # 初始化界面（定时更新由主窗口的帧调度器驱动）
         self.init_ui()
-        
-        # 更新计时器
-        self.timer = pg.QtCore.QTimer()
-        self.timer.timeout.connect(self.update_monitor)
-        self.timer.start(500)  # 每500ms更新一次
     
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -52,8 +47,12 @@ class MonitorPanel(QWidget):
         self.disk_label.setAlignment(Qt.AlignCenter)
         self.info_layout.addWidget(self.disk_label)
         
+        self.shadow_label = QLabel()
+        self.shadow_label.setAlignment(Qt.AlignCenter)
+        self.info_layout.addWidget(self.shadow_label)
+        
         # 设置样式
-        for label in [self.mass_label, self.spin_label, self.disk_label]:
+        for label in [self.mass_label, self.spin_label, self.disk_label, self.shadow_label]:
             label.setObjectName("valueLabel")
     
     def init_charts(self, parent_layout):
@@ -72,12 +71,22 @@ class MonitorPanel(QWidget):
         self.lens_plot.setMinimumHeight(200)
         self.lens_plot.showGrid(x=True, y=True, alpha=0.3)
         
+        # 光变曲线图表（观测量引擎实时数据）
+        self.flux_plot = pg.PlotWidget(title="积分流量光变曲线")
+        self.flux_plot.setBackground('w')
+        self.flux_plot.setMinimumHeight(200)
+        self.flux_plot.showGrid(x=True, y=True, alpha=0.3)
+        self.flux_plot.setLabel('left', "积分流量 (R_s²)", color='#333')
+        self.flux_plot.setLabel('bottom', "时间 (秒)", color='#333')
+        self.flux_curve = self.flux_plot.plot(pen=pg.mkPen(color='#9b59b6', width=2))
+        
         chart_layout.addWidget(self.temp_plot)
         chart_layout.addWidget(self.lens_plot)
+        chart_layout.addWidget(self.flux_plot)
         parent_layout.addLayout(chart_layout, 2)
         
         # 设置图表样式
-        for plot in [self.temp_plot, self.lens_plot]:
+        for plot in [self.temp_plot, self.lens_plot, self.flux_plot]:
             plot.setAntialiasing(True)
             plot.getPlotItem().getAxis('left').setTextPen('k')
             plot.getPlotItem().getAxis('bottom').setTextPen('k')
@@ -98,6 +107,23 @@ class MonitorPanel(QWidget):
         # 更新引力透镜图表
         self.update_lens_plot()
     
+    def update_light_curve(self):
+        """用观测数据环中的观测量刷新光变曲线（只更新曲线数据，开销很小）"""
+        records = [d for d in self.simulator.observation_data if 'flux' in d]
+        if not records:
+            return
+        
+        t0 = records[0]['timestamp']
+        t = np.array([d['timestamp'] - t0 for d in records])
+        flux = np.array([d['flux'] for d in records])
+        self.flux_curve.setData(t, flux)
+        
+        latest = records[-1]
+        self.shadow_label.setText(
+            f"阴影直径: {latest['shadow_diameter']:.2f} R_s\n"
+            f"质心偏移: ({latest['centroid_x']:.2f}, {latest['centroid_y']:.2f}) R_s"
+        )
+    
     def update_temp_plot(self):
         """更新温度分布图表"""
         self.temp_plot.clear()
@@ -157,8 +183,6 @@ class MonitorPanel(QWidget):
         self.lens_plot.addItem(hor_line)
         
         # 添加图例
-        self.lens_plot.addItem(
-            pg.TextItem("事件视界", color='#e67e22', anchor=(0,1)), 
-            self.simulator.accretion_disk_inner_radius, 
-            max(deflection_angle)
-        )
+        horizon_text = pg.TextItem("事件视界", color='#e67e22', anchor=(0,1))
+        horizon_text.setPos(self.simulator.accretion_disk_inner_radius, max(deflection_angle))
+        self.lens_plot.addItem(horizon_text)
@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class MultiViewRenderer:
+    """多观察者渲染 - 在一次批量计算中为 N 个相机渲染同一个模拟器
+    
+    与相机无关的部分只计算一次并在所有视角间共享：
+    - 径向偏折表：像平面半径 -> 偏折后的盘面半径与透镜强度
+    - 吸积盘辐射纹理：(r, φ) 网格上的辐射强度与颜色（含当前时刻的湍流）
+    每个相机只需做坐标变换和查表。
+    """
+    
+    def __init__(self, simulator, resolution=256, texture_shape=(128, 512), table_size=4096):
+        self.simulator = simulator
+        self.resolution = resolution
+        self.texture_shape = texture_shape
+        self.table_size = table_size
+        
+        self._lens_table = None
+        self._lens_table_key = None
+        self._disk_texture = None
+        self._disk_texture_key = None
+    
+    def params_key(self):
+        """影响渲染结果的模拟参数"""
+        sim = self.simulator
+        return (sim.black_hole_mass, sim.light_bending_strength, sim.doppler_factor,
+                sim.accretion_disk_inner_radius, sim.accretion_disk_outer_radius,
+                sim.accretion_disk_temp, sim.accretion_disk_turbulence)
+    
+    def lens_table(self, r_max):
+        """径向偏折表 (单位 R_s)：(像平面半径, 偏折后带符号的半径, 透镜强度)"""
+        sim = self.simulator
+        key = (sim.light_bending_strength, sim.schwarzschild_radius,
+               sim.accretion_disk_inner_radius, r_max)
+        if self._lens_table_key != key:
+            rs = sim.schwarzschild_radius
+            r = np.linspace(0.0, r_max, self.table_size)
+            lensed_x, _, intensity = sim.simulate_gravitational_lens_batch(r * rs, np.zeros_like(r))
+            self._lens_table = (r, lensed_x / rs, intensity)
+            self._lens_table_key = key
+        return self._lens_table
+    
+    def disk_texture(self):
+        """吸积盘在 (r, φ) 网格上的辐射强度和颜色"""
+        sim = self.simulator
+        key = (self.params_key(), sim.time)
+        if self._disk_texture_key != key:
+            n_r, n_phi = self.texture_shape
+            inner = sim.accretion_disk_inner_radius
+            outer = sim.accretion_disk_outer_radius
+            r = inner + (outer - inner) * (np.arange(n_r) + 0.5) / n_r
+            phi = 2 * np.pi * (np.arange(n_phi) + 0.5) / n_phi
+            x = r[:, None] * np.cos(phi)[None, :]
+            y = r[:, None] * np.sin(phi)[None, :]
+            self._disk_texture = sim.sample_accretion_disk_batch(x, y)
+            self._disk_texture_key = key
+        return self._disk_texture
+    
+    def render(self, view_angles, zoom=1.0, include_particles=True):
+        """渲染多个视角
+        :param view_angles: 视角角度列表（度）
+        :return: (N, resolution, resolution, 3) uint8 堆叠数组
+        """
+        sim = self.simulator
+        size = self.resolution
+        rs = sim.schwarzschild_radius
+        render_radius = sim.accretion_disk_outer_radius * rs * zoom
+        inner = sim.accretion_disk_inner_radius
+        outer = sim.accretion_disk_outer_radius
+        angles = np.atleast_1d(np.asarray(view_angles, dtype=np.float64))
+        
+        # 所有相机的观察平面坐标 (R_s)，形状 (N, H, W)
+        coords = 2.0 * (np.arange(size) - size/2) / size * render_radius / rs
+        view_cos = np.cos(np.radians(angles))
+        px = coords[None, None, :] * view_cos[:, None, None]
+        py = coords[None, :, None]
+        r = np.hypot(px, py)
+        
+        # 共享的径向偏折表（均匀网格，直接按下标线性插值）
+        table_r, table_lensed, table_intensity = self.lens_table(coords.max() * np.sqrt(2) + 1.0)
+        t = r * ((len(table_r) - 1) / table_r[-1])
+        i0 = np.minimum(t.astype(np.int64), len(table_r) - 2)
+        frac = t - i0
+        lensed_r = table_lensed[i0] * (1 - frac) + table_lensed[i0 + 1] * frac
+        
+        # 只处理落在吸积盘上的光线
+        rho = np.abs(lensed_r)
+        hit = np.flatnonzero((rho >= inner) & (rho <= outer))
+        planes = np.zeros((3, r.size))  # 按通道分平面存储，散射写入更快
+        if len(hit):
+            i0 = i0.ravel()[hit]
+            frac = frac.ravel()[hit]
+            lens_intensity = table_intensity[i0] * (1 - frac) + table_intensity[i0 + 1] * frac
+            
+            # 盘面方位角（偏折为负时像点位于盘面另一侧）
+            phi = np.arctan2(np.broadcast_to(py, r.shape).ravel()[hit],
+                             np.broadcast_to(px, r.shape).ravel()[hit])
+            phi = np.where(lensed_r.ravel()[hit] < 0, phi + np.pi, phi)
+            
+            # 共享的吸积盘纹理查表
+            disk_intensity, disk_color = self.disk_texture()
+            n_r, n_phi = self.texture_shape
+            ri = np.clip(((rho.ravel()[hit] - inner) / max(outer - inner, 1e-10) * n_r).astype(np.int64), 0, n_r - 1)
+            pi_idx = np.floor(phi * (n_phi / (2 * np.pi))).astype(np.int64) % n_phi
+            texel = ri * n_phi + pi_idx
+            
+            intensity = disk_intensity.ravel()[texel]
+            weight = np.where(intensity > 0, np.minimum(1.0, intensity * lens_intensity), 0.0)
+            for c in range(3):
+                color = np.take(disk_color[..., c].ravel(), texel)
+                planes[c, hit] = np.minimum(255, np.trunc(color * weight))
+        rgb = planes.reshape(3, len(angles), size, size).transpose(1, 2, 3, 0)
+        
+        if include_particles:
+            prepared = sim.particles.prepare_splat(sim)
+            for i, angle in enumerate(angles):
+                sim.particles.splat(rgb[i], sim, angle, render_radius, prepared)
+        
+        return np.minimum(rgb, 255).astype(np.uint8)
+    
+    def export(self, path, view_angles, zoom=1.0):
+        """渲染并把 (N, H, W, 3) 堆叠数组保存为 .npy"""
+        stack = self.render(view_angles, zoom)
+        np.save(path, stack)
+        return stack
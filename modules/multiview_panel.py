@@ -0,0 +1,155 @@
+import numpy as np
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                             QComboBox, QPushButton, QFileDialog, QSizePolicy)
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, QThread, QObject, pyqtSignal
+
+from modules.multiview import MultiViewRenderer
+from modules.renderer import BlackHoleRenderer
+
+
+class MultiViewWorker(QObject):
+    """在后台线程中批量渲染多个视角，避免阻塞界面"""
+    stackReady = pyqtSignal(object, object)  # 渲染失败时堆叠为 None
+    
+    def __init__(self, multiview):
+        super().__init__()
+        self.multiview = multiview
+    
+    def render(self, view_angles, zoom):
+        try:
+            stack = self.multiview.render(view_angles, zoom)
+        except Exception as e:
+            print(f"多视角渲染失败: {str(e)}")
+            stack = None
+        self.stackReady.emit(stack, view_angles)
+
+
+class MultiViewPanel(QWidget):
+    """多视角面板 - 以网格显示同一模拟器在多个视角下的渲染"""
+    PRESETS = ["倾角序列", "立体像对", "正交四视图"]
+    renderRequested = pyqtSignal(object, float)
+    
+    def __init__(self, simulator, renderer, parent=None):
+        super().__init__(parent)
+        self.simulator = simulator
+        self.renderer = renderer  # 提供当前视角与缩放
+        self.multiview = MultiViewRenderer(simulator)
+        self.last_stack = None
+        self.last_angles = []
+        self.setObjectName("multiViewPanel")
+        
+        # 后台渲染线程；界面线程只负责设置图块
+        self._render_pending = False
+        self._render_dirty = False
+        self._thread = QThread(self)
+        self._worker = MultiViewWorker(self.multiview)
+        self._worker.moveToThread(self._thread)
+        self.renderRequested.connect(self._worker.render)
+        self._worker.stackReady.connect(self.on_stack_ready)
+        self._thread.start()
+        
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        
+        # 工具栏
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("视角组合:"))
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItems(self.PRESETS)
+        self.preset_combo.currentIndexChanged.connect(self.refresh)
+        toolbar.addWidget(self.preset_combo)
+        toolbar.addStretch(1)
+        self.export_btn = QPushButton("导出堆叠数组")
+        self.export_btn.clicked.connect(self.export_stack)
+        toolbar.addWidget(self.export_btn)
+        layout.addLayout(toolbar)
+        
+        # 视图网格
+        self.grid = QGridLayout()
+        self.grid.setSpacing(6)
+        layout.addLayout(self.grid, 1)
+        self.tiles = []
+    
+    def view_angles(self):
+        """当前预设对应的视角列表"""
+        base = self.renderer.view_angle
+        preset = self.preset_combo.currentIndex()
+        if preset == 0:
+            return [15.0, 35.0, 55.0, 75.0]
+        if preset == 1:
+            return [base - 2.5, base + 2.5]
+        return [(base + offset) % 360 for offset in (0.0, 90.0, 180.0, 270.0)]
+    
+    def ensure_tiles(self, count):
+        """按视角数量重建网格中的图块"""
+        if len(self.tiles) == count:
+            return
+        for tile, caption in self.tiles:
+            for widget in (tile, caption):
+                self.grid.removeWidget(widget)
+                widget.deleteLater()
+        self.tiles = []
+        
+        columns = min(count, 4)
+        for i in range(count):
+            tile = QLabel()
+            tile.setAlignment(Qt.AlignCenter)
+            tile.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+            caption = QLabel()
+            caption.setAlignment(Qt.AlignCenter)
+            self.grid.addWidget(tile, (i // columns) * 2, i % columns)
+            self.grid.addWidget(caption, (i // columns) * 2 + 1, i % columns)
+            self.tiles.append((tile, caption))
+    
+    def is_rendering(self):
+        """后台线程是否正在渲染"""
+        return self._render_pending
+    
+    def refresh(self):
+        """请求后台线程批量渲染所有视角；若上一批未完成则合并请求"""
+        if not self.isVisible():
+            return
+        if self._render_pending:
+            self._render_dirty = True
+            return
+        self._render_pending = True
+        self._render_dirty = False
+        self.renderRequested.emit(self.view_angles(), self.renderer.zoom)
+    
+    def on_stack_ready(self, stack, angles):
+        """后台渲染完成后更新网格；stack 为 None 表示渲染失败，保留上一批图块"""
+        self._render_pending = False
+        if stack is None:
+            if self._render_dirty:
+                self.refresh()
+            return
+        self.last_stack = stack
+        self.last_angles = angles
+        
+        self.ensure_tiles(len(angles))
+        for (tile, caption), frame, angle in zip(self.tiles, self.last_stack, angles):
+            image = BlackHoleRenderer.buffer_to_image(frame)
+            side = max(1, min(tile.width(), tile.height()))
+            tile.setPixmap(QPixmap.fromImage(image).scaled(side, side, Qt.KeepAspectRatio,
+                                                           Qt.SmoothTransformation))
+            caption.setText(f"观测角度: {angle % 360:.1f}°")
+        
+        if self._render_dirty:
+            self.refresh()
+    
+    def shutdown(self):
+        """停止后台渲染线程"""
+        self._thread.quit()
+        self._thread.wait()
+    
+    def export_stack(self):
+        """把最近一次的堆叠数组 (N, H, W, 3) 保存为 .npy"""
+        if self.last_stack is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出多视角渲染", "multiview.npy", "NumPy 数组 (*.npy)")
+        if path:
+            np.save(path, self.last_stack)
@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class ParticleSystem:
+    """吸积盘中的测试粒子与热斑
+    
+    粒子状态以结构数组 (SoA) 形式保存在连续的 NumPy 缓冲区中，
+    在 Paczyński-Wiita 赝牛顿势 Φ = -GM/(r - R_s) 下用向量化的
+    蛙跳 (kick-drift-kick) 辛积分器推进。该势在 3 R_s 处给出与
+    史瓦西度规相同的最内稳定圆轨道。
+    
+    长度单位为史瓦西半径 R_s，时间单位为 R_s/c，因此 GM = 0.5。
+    """
+    GM = 0.5
+    MAX_SUBSTEP = 0.25   # 单个积分子步的最大时长 (R_s/c)
+    
+    def __init__(self, count=50000, hot_spots=4, seed=2011):
+        self.rng = np.random.default_rng(seed)
+        self.hot_spots = hot_spots
+        self.resize(count)
+    
+    def resize(self, count):
+        """重新分配粒子缓冲区（前 hot_spots 个粒子为热斑）"""
+        count = max(int(count), self.hot_spots)
+        self.count = count
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.brightness = np.zeros(count)
+        self.hot = np.zeros(count, dtype=bool)
+        self.hot[:self.hot_spots] = True
+        self._seeded = False
+    
+    def seed(self, inner_radius, outer_radius, index=None):
+        """在吸积盘内以近圆轨道生成粒子；index 为 None 时重置全部粒子"""
+        if index is None:
+            index = np.arange(self.count)
+        n = len(index)
+        if n == 0:
+            return
+        
+        # 按面积均匀分布半径，热斑集中在内区
+        hot = self.hot[index]
+        r2 = self.rng.uniform(inner_radius ** 2, outer_radius ** 2, n)
+        r = np.where(hot, self.rng.uniform(inner_radius, inner_radius * 1.5, n), np.sqrt(r2))
+        phi = self.rng.uniform(0, 2 * np.pi, n)
+        
+        # 赝牛顿势下的圆轨道速度，加少量扰动产生偏心率
+        v = np.sqrt(self.GM * r) / (r - 1.0) * self.rng.normal(1.0, 0.02, n)
+        self.x[index] = r * np.cos(phi)
+        self.y[index] = r * np.sin(phi)
+        self.vx[index] = -v * np.sin(phi)
+        self.vy[index] = v * np.cos(phi)
+        self.brightness[index] = np.where(hot, 1.0, self.rng.uniform(0.2, 0.6, n))
+        self._seeded = True
+    
+    def acceleration(self):
+        """Paczyński-Wiita 势下的加速度"""
+        r = np.hypot(self.x, self.y)
+        a = -self.GM / (r * (r - 1.0) ** 2)
+        return a * self.x, a * self.y
+    
+    def step(self, dt, inner_radius, outer_radius):
+        """用蛙跳积分器推进 dt，落入黑洞或飞出吸积盘的粒子重新生成"""
+        if outer_radius <= inner_radius:
+            # 吸积盘为空：不显示粒子，半径恢复有效后重新生成全部粒子
+            self._seeded = False
+            return
+        if not self._seeded:
+            self.seed(inner_radius, outer_radius)
+        
+        substeps = max(1, int(np.ceil(dt / self.MAX_SUBSTEP)))
+        h = dt / substeps
+        
+        ax, ay = self.acceleration()
+        for _ in range(substeps):
+            self.vx += 0.5 * h * ax
+            self.vy += 0.5 * h * ay
+            self.x += h * self.vx
+            self.y += h * self.vy
+            ax, ay = self.acceleration()
+            self.vx += 0.5 * h * ax
+            self.vy += 0.5 * h * ay
+        
+        r = np.hypot(self.x, self.y)
+        lost = np.flatnonzero((r < max(1.5, inner_radius * 0.5)) | (r > outer_radius * 1.5))
+        self.seed(inner_radius, outer_radius, lost)
+    
+    def prepare_splat(self, simulator, gain=0.6):
+        """计算与相机无关的粒子像位置 (km) 和颜色，可在多个视角间共享
+        
+        粒子位于吸积盘平面，借助模拟器的径向透镜查找表找到其在观察平面上的像。
+        :return: (rx, ry, colors)
+        """
+        # 盘面半径 -> 像平面半径（主像）
+        disk_r = np.hypot(self.x, self.y)
+        image_r, lens_intensity = simulator.lensing_lookup(disk_r)
+        scale = image_r / np.maximum(disk_r, 1e-10) * simulator.schwarzschild_radius
+        rx = self.x * scale
+        ry = self.y * scale
+        
+        # 粒子颜色与亮度取自当地吸积盘辐射，热斑为固定的高亮白色
+        disk_intensity, disk_color = simulator.sample_accretion_disk_batch(self.x, self.y)
+        weight = self.brightness * lens_intensity * gain
+        colors = disk_color * (weight * np.sqrt(disk_intensity))[:, None]
+        colors[self.hot] = 255.0 * weight[self.hot, None]
+        return rx, ry, colors
+    
+    def splat(self, rgb, simulator, view_angle, render_radius, prepared=None):
+        """把粒子叠加到渲染缓冲区
+        :param rgb: (size, size, 3) 浮点渲染缓冲区，原地累加
+        :param prepared: prepare_splat 的结果；为 None 时现场计算
+        """
+        if not self._seeded or self.count == 0:
+            return rgb
+        size = rgb.shape[0]
+        view_cos = np.cos(np.radians(view_angle))
+        if abs(view_cos) < 1e-3:
+            return rgb  # 侧视时投影退化
+        
+        rx, ry, colors = prepared if prepared is not None else self.prepare_splat(simulator)
+        
+        # 像平面 (km) -> 像素
+        sx = rx / view_cos
+        px = np.floor(sx / render_radius * size / 2 + size / 2).astype(np.int64)
+        py = np.floor(ry / render_radius * size / 2 + size / 2).astype(np.int64)
+        
+        # 热斑展开为 3x3 的亮斑
+        hot_idx = np.flatnonzero(self.hot)
+        if len(hot_idx):
+            dx, dy = np.meshgrid([-1, 0, 1], [-1, 0, 1])
+            px = np.concatenate([px, (px[hot_idx, None] + dx.ravel()).ravel()])
+            py = np.concatenate([py, (py[hot_idx, None] + dy.ravel()).ravel()])
+            colors = np.concatenate([colors, np.repeat(colors[hot_idx] * 0.5, 9, axis=0)])
+        
+        visible = (px >= 0) & (px < size) & (py >= 0) & (py < size)
+        flat = py[visible] * size + px[visible]
+        colors = colors[visible]
+        
+        # bincount 比 np.add.at 快得多
+        for c in range(3):
+            rgb[..., c] += np.bincount(flat, weights=colors[:, c], minlength=size * size).reshape(size, size)
+        return rgb
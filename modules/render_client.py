@@ -0,0 +1,93 @@
+import sys
+import json
+import socket
+import threading
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+from modules.render_protocol import HEADER, DEFAULT_SOCKET, encode_message
+
+
+# 附加共享内存与注销 resource_tracker 登记必须成对执行，多线程下加锁
+_attach_lock = threading.Lock()
+
+
+class RenderServiceError(RuntimeError):
+    """渲染服务返回的错误"""
+
+
+class RenderClient:
+    """渲染服务客户端 - 通过 Unix 域套接字请求帧，从共享内存读取结果
+    
+    例:
+        with RenderClient() as client:
+            frame = client.render({'mass': 1e7}, view_angle=60)
+    """
+    
+    def __init__(self, path=DEFAULT_SOCKET, timeout=30.0, retries=3):
+        self.path = path
+        self.retries = retries  # 帧在读取前被服务端缓存淘汰时的重试次数
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.sock.close()
+    
+    def request(self, message):
+        """发送一条消息并等待响应"""
+        self.sock.sendall(encode_message(message))
+        (length,) = HEADER.unpack(self._recv_exactly(HEADER.size))
+        response = json.loads(self._recv_exactly(length))
+        if not response.get('ok'):
+            raise RenderServiceError(response.get('error', "未知错误"))
+        return response
+    
+    def _recv_exactly(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("渲染服务已断开连接")
+            data.extend(chunk)
+        return bytes(data)
+    
+    def render(self, params=None, view_angle=45.0, zoom=1.0, resolution=256):
+        """请求一帧渲染
+        :param params: 模拟参数（键同 ControlPanel.parametersChanged，未给出的取默认值）
+        :return: (resolution, resolution, 3) uint8 图像
+        """
+        message = {'op': 'render', 'params': params or {}, 'view_angle': view_angle,
+                   'zoom': zoom, 'resolution': resolution}
+        for attempt in range(self.retries + 1):
+            response = self.request(message)
+            try:
+                return read_shared_frame(response['shm'], response['shape'], response['dtype'])
+            except FileNotFoundError:
+                if attempt == self.retries:
+                    raise
+    
+    def stats(self):
+        """服务端计数：请求数、实际渲染数、缓存命中、合并的重复请求、批次数等"""
+        return self.request({'op': 'stats'})['stats']
+
+
+def read_shared_frame(name, shape, dtype='uint8'):
+    """从服务端的共享内存块复制出一帧"""
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        with _attach_lock:
+            shm = shared_memory.SharedMemory(name=name)
+            # 共享内存归服务端所有：不让本进程的 resource_tracker 在退出时删除它
+            resource_tracker.unregister(shm._name, 'shared_memory')
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import numpy as np
+
+from modules.render_client import RenderClient
+
+
+def wait_for_socket(path, timeout=30.0):
+    """等待服务端创建套接字"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            RenderClient(path).close()
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(0.05)
+    raise TimeoutError(f"渲染服务未在 {timeout:.0f} 秒内启动: {path}")
+
+
+def client_worker(path, requests, angles, resolution, seed, latencies, errors):
+    """单个客户端：顺序发送 requests 个请求，记录每个请求的延迟"""
+    rng = np.random.default_rng(seed)
+    with RenderClient(path) as client:
+        for _ in range(requests):
+            angle = float(rng.choice(angles))
+            start = time.perf_counter()
+            try:
+                client.render(view_angle=angle, resolution=resolution)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            latencies.append(time.perf_counter() - start)
+
+
+def run_load_test(path, clients=8, requests=50, distinct_angles=32, resolution=256):
+    """并发运行多个客户端
+    :param distinct_angles: 请求视角从这么多个不同取值中随机抽取，决定重复请求所占比例
+    :return: 结果字典（吞吐量与延迟百分位）
+    """
+    angles = np.linspace(0.0, 360.0, distinct_angles, endpoint=False)
+    latencies, errors = [], []
+    with RenderClient(path) as client:
+        before = client.stats()
+    
+    threads = [
+        threading.Thread(target=client_worker,
+                         args=(path, requests, angles, resolution, i, latencies, errors))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    with RenderClient(path) as client:
+        after = client.stats()
+    server = {name: after[name] - before.get(name, 0) for name in after}
+    
+    latency_ms = np.array(latencies) * 1000.0
+    p50, p90, p99 = np.percentile(latency_ms, [50, 90, 99]) if len(latency_ms) else (0.0, 0.0, 0.0)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': p50,
+        'p90_ms': p90,
+        'p99_ms': p99,
+        'server': server,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="渲染服务压力测试")
+    parser.add_argument('--socket', default=None, help="已运行的渲染服务套接字；不指定则自动启动一个")
+    parser.add_argument('--clients', type=int, default=8, help="并发客户端数")
+    parser.add_argument('--requests', type=int, default=50, help="每个客户端的请求数")
+    parser.add_argument('--distinct-angles', type=int, default=32, help="不同视角的数量")
+    parser.add_argument('--resolution', type=int, default=256, help="渲染分辨率")
+    args = parser.parse_args(argv)
+    
+    server = None
+    path = args.socket
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'render.sock')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        server = subprocess.Popen([sys.executable, '-m', 'modules.render_service', '--socket', path],
+                                  cwd=root)
+    try:
+        wait_for_socket(path)
+        result = run_load_test(path, args.clients, args.requests, args.distinct_angles, args.resolution)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    
+    print(f"请求数: {result['requests']}  错误: {result['errors']}  耗时: {result['elapsed']:.2f} s")
+    print(f"吞吐量: {result['throughput']:.1f} 请求/秒")
+    print(f"延迟: p50 {result['p50_ms']:.1f} ms   p90 {result['p90_ms']:.1f} ms   p99 {result['p99_ms']:.1f} ms")
+    server_stats = result['server']
+    print(f"服务端: 实际渲染 {server_stats['renders']}  缓存命中 {server_stats['cache_hits']}  "
+          f"合并重复请求 {server_stats['dedup_hits']}  批次 {server_stats['batches']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import json
+import struct
+import tempfile
+
+# 渲染服务与客户端共用的消息格式，不依赖模拟器模块
+
+# 消息格式：4 字节大端长度 + UTF-8 JSON
+HEADER = struct.Struct('!I')
+MAX_MESSAGE_SIZE = 1 << 20
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'blackhole-render.sock')
+
+
+def encode_message(message):
+    """把消息编码为带长度前缀的字节串"""
+    body = json.dumps(message).encode('utf-8')
+    return HEADER.pack(len(body)) + body
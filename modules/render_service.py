@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import math
+import socket
+import signal
+import asyncio
+import hashlib
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+from modules.simulation import BlackHoleSimulator
+from modules.multiview import MultiViewRenderer
+from modules.render_protocol import HEADER, MAX_MESSAGE_SIZE, DEFAULT_SOCKET, encode_message
+
+# 请求中可设置的模拟参数（与 ControlPanel.parametersChanged 的键一致）
+PARAM_KEYS = ('mass', 'spin', 'accretion_rate', 'disk_inner_radius', 'disk_outer_radius',
+              'disk_temp', 'disk_turbulence', 'light_bending', 'doppler_effect')
+
+
+# read_message 在连接关闭时返回的标记（与 JSON null 区分）
+_CLOSED = object()
+
+
+def finite(name, value):
+    """把请求中的数值转换为有限浮点数"""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} 必须是有限数值: {value}")
+    return value
+
+
+def default_params():
+    """BlackHoleSimulator 的默认参数"""
+    return BlackHoleSimulator().get_params()
+
+
+async def read_message(reader):
+    """读取一条消息，连接关闭时返回 _CLOSED"""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError:
+        return _CLOSED
+    (length,) = HEADER.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"消息过长: {length} 字节")
+    return json.loads(await reader.readexactly(length))
+
+
+class RenderService:
+    """本地渲染服务 - 在一个进程中为多个客户端渲染并共享帧
+    
+    - 同一批窗口内到达的请求按 (参数, 缩放, 分辨率) 分组，每组用
+      MultiViewRenderer 一次批量渲染所有视角；
+    - 相同请求（参数和相机都相同）只渲染一次：已完成的帧在 LRU 缓存中，
+      正在渲染的请求共享同一个 Future；
+    - 帧数据放在共享内存中，响应里只返回共享内存名称和形状。
+    帧不含测试粒子，且模拟时间固定为 0，保证同一请求的结果可复用。
+    """
+    
+    def __init__(self, cache_size=256, batch_window=0.002, max_resolution=1024):
+        self.cache_size = cache_size      # 缓存的最大帧数（超出时释放最久未用的共享内存）
+        self.batch_window = batch_window  # 收集一批请求的等待时间 (秒)
+        self.max_resolution = max_resolution
+        
+        self.simulator = BlackHoleSimulator()
+        self.defaults = default_params()
+        self.renderers = {}  # 分辨率 -> MultiViewRenderer，共用同一个模拟器
+        
+        self.cache = OrderedDict()  # 请求键 -> (SharedMemory, shape)
+        self.inflight = {}          # 请求键 -> Future
+        self.pending = []           # 本批待渲染的 (键, 请求)
+        self._batch_scheduled = False
+        # 渲染放在单个工作线程中，避免并发修改模拟器
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        
+        self.stats = {'requests': 0, 'renders': 0, 'cache_hits': 0,
+                      'dedup_hits': 0, 'batches': 0, 'errors': 0}
+    
+    def normalize(self, request):
+        """校验请求并补全默认参数，返回 (键, 规范化请求)"""
+        overrides = request.get('params', {})
+        if not isinstance(overrides, dict):
+            raise ValueError("params 必须是 JSON 对象")
+        params = dict(self.defaults)
+        for name, value in overrides.items():
+            if name not in PARAM_KEYS:
+                raise ValueError(f"未知参数: {name}")
+            params[name] = finite(name, value)
+        resolution = int(request.get('resolution', 256))
+        if not 16 <= resolution <= self.max_resolution:
+            raise ValueError(f"分辨率超出范围: {resolution}")
+        zoom = finite('zoom', request.get('zoom', 1.0))
+        if zoom <= 0:
+            raise ValueError(f"缩放必须大于 0: {zoom}")
+        camera = {
+            'view_angle': round(finite('view_angle', request.get('view_angle', 45.0)) % 360, 6),
+            'zoom': round(zoom, 6),
+            'resolution': resolution,
+        }
+        normalized = {'params': params, **camera}
+        key = hashlib.sha1(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+        return key, normalized
+    
+    async def submit(self, request):
+        """提交一个渲染请求，返回 (键, 共享内存, 形状, 是否命中缓存)"""
+        self.stats['requests'] += 1
+        key, normalized = self.normalize(request)
+        
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            shm, shape = self.cache[key]
+            return key, shm, shape, True
+        
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats['dedup_hits'] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self.inflight[key] = future
+            self.pending.append((key, normalized))
+            if not self._batch_scheduled:
+                self._batch_scheduled = True
+                asyncio.get_running_loop().call_later(self.batch_window, self._start_batch)
+        shm, shape = await asyncio.shield(future)
+        return key, shm, shape, False
+    
+    def _start_batch(self):
+        self._batch_scheduled = False
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.ensure_future(self.run_batch(batch))
+    
+    async def run_batch(self, batch):
+        """按参数分组批量渲染一批请求，并唤醒等待的客户端"""
+        self.stats['batches'] += 1
+        groups = OrderedDict()
+        for key, request in batch:
+            group = (tuple(sorted(request['params'].items())), request['zoom'], request['resolution'])
+            groups.setdefault(group, []).append((key, request))
+        
+        loop = asyncio.get_running_loop()
+        for (params, zoom, resolution), items in groups.items():
+            angles = [request['view_angle'] for _, request in items]
+            try:
+                stack = await loop.run_in_executor(self.executor, self.render_group,
+                                                   dict(params), angles, zoom, resolution)
+            except Exception as e:
+                # 组内某个请求出错时逐个重新渲染，只让出错的请求失败
+                if len(items) == 1:
+                    self.fail(items[0][0], e)
+                    continue
+                for key, request in items:
+                    try:
+                        stack = await loop.run_in_executor(self.executor, self.render_group, dict(params),
+                                                           [request['view_angle']], zoom, resolution)
+                    except Exception as e:
+                        self.fail(key, e)
+                        continue
+                    self.finish(key, stack[0])
+                continue
+            
+            for (key, _), frame in zip(items, stack):
+                self.finish(key, frame)
+    
+    def finish(self, key, frame):
+        """缓存渲染好的帧并唤醒等待它的客户端"""
+        self.stats['renders'] += 1
+        entry = self.store(key, frame)
+        self.inflight.pop(key).set_result(entry)
+    
+    def fail(self, key, error):
+        """以错误结束一个请求"""
+        self.stats['errors'] += 1
+        self.inflight.pop(key).set_exception(error)
+    
+    def render_group(self, params, view_angles, zoom, resolution):
+        """在工作线程中渲染同一组参数下的多个视角"""
+        self.simulator.set_params(params)
+        renderer = self.renderers.get(resolution)
+        if renderer is None:
+            renderer = self.renderers[resolution] = MultiViewRenderer(self.simulator, resolution=resolution)
+        return renderer.render(view_angles, zoom, include_particles=False)
+    
+    def store(self, key, frame):
+        """把帧复制到新的共享内存块并放入 LRU 缓存"""
+        shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        shm.buf[:frame.nbytes] = frame.tobytes()
+        self.cache[key] = (shm, frame.shape)
+        while len(self.cache) > self.cache_size:
+            _, (old, _) = self.cache.popitem(last=False)
+            old.close()
+            old.unlink()
+        return shm, frame.shape
+    
+    async def handle_client(self, reader, writer):
+        """处理一个客户端连接上的全部请求（请求按顺序应答）"""
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is _CLOSED:
+                    break
+                writer.write(encode_message(await self.respond(message)))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            print(f"渲染服务连接错误: {str(e)}")
+        finally:
+            writer.close()
+    
+    async def respond(self, message):
+        """生成一条请求的响应"""
+        if not isinstance(message, dict):
+            return {'ok': False, 'error': f"请求必须是 JSON 对象: {type(message).__name__}"}
+        op = message.get('op', 'render')
+        if op == 'stats':
+            return {'ok': True, 'stats': dict(self.stats, cached_frames=len(self.cache))}
+        if op != 'render':
+            return {'ok': False, 'error': f"未知操作: {op}"}
+        try:
+            key, shm, shape, cached = await self.submit(message)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'key': key, 'shm': shm.name, 'shape': list(shape),
+                'dtype': 'uint8', 'cached': cached}
+    
+    def close(self):
+        """释放全部共享内存"""
+        self.executor.shutdown(wait=True)
+        for shm, _ in self.cache.values():
+            shm.close()
+            shm.unlink()
+        self.cache.clear()
+
+
+def socket_in_use(path):
+    """path 上是否已有服务在监听"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+async def serve(path=DEFAULT_SOCKET, **kwargs):
+    """在 Unix 域套接字 path 上运行渲染服务，直到被取消"""
+    if os.path.exists(path):
+        if socket_in_use(path):
+            raise RuntimeError(f"已有渲染服务在运行: {path}")
+        # 上次异常退出留下的套接字文件
+        os.unlink(path)
+    service = RenderService(**kwargs)
+    server = await asyncio.start_unix_server(service.handle_client, path=path)
+    # SIGTERM 时取消服务，确保共享内存被释放
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    print(f"渲染服务已启动: {path}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="黑洞本地渲染服务")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix 域套接字路径")
+    parser.add_argument('--cache-size', type=int, default=256, help="缓存的最大帧数")
+    parser.add_argument('--batch-window', type=float, default=2.0, help="批量收集窗口 (毫秒)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket, cache_size=args.cache_size,
+                          batch_window=args.batch_window / 1000.0))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    except RuntimeError as e:
+        print(f"渲染服务启动失败: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
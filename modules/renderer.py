@@ -1,10 +1,38 @@
+import os
+import time
 import numpy as np
-from math import cos, sin, pi, exp, log10, sqrt
-from PyQt5.QtWidgets import QOpenGLWidget, QWidget
-from PyQt5.QtGui import QPainter, QColor, QBrush
-from PyQt5.QtCore import Qt, QTimer
+from math import cos, pi, exp, log10, sqrt
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QColor, QBrush, QImage
+from PyQt5.QtCore import Qt, QThread, QObject, QRectF, QStandardPaths, pyqtSignal
+
+from modules.startup import timeline
+from modules.bands import BAND_SHADERS, shade_bands, colorize
+from modules.antialias import AdaptiveAntialiaser
+from modules.telemetry import telemetry, StageTimer, params_hash, current_rss
+
+
+class RenderWorker(QObject):
+    """在后台线程中计算渲染帧，避免阻塞界面"""
+    frameReady = pyqtSignal(object)  # 渲染失败时为 None
+    
+    def __init__(self, renderer):
+        super().__init__()
+        self.renderer = renderer
+    
+    def render(self, view_angle, dt):
+        try:
+            buffer = self.renderer.compute_frame(view_angle, dt)
+        except Exception as e:
+            print(f"渲染帧失败: {str(e)}")
+            buffer = None
+        self.frameReady.emit(buffer)
+
 
 class BlackHoleRenderer(QWidget):
+    renderRequested = pyqtSignal(float, float)
+    firstFramePainted = pyqtSignal()
+    
     def __init__(self, simulator, parent=None):
         super().__init__(parent)
         self.simulator = simulator
@@ -14,16 +42,78 @@ class BlackHoleRenderer(QWidget):
         # 渲染参数
         self.resolution = 512
         self.render_buffer = None
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_render)
-        self.timer.start(100)  # 10 FPS
+        self.render_image = None
+        self.first_frame_rendered = False
+        self._first_frame_painted = False
         
         # 视角参数
         self.view_angle = 45.0  # 视角角度（度）
         self.zoom = 1.0
         
-        # 初始化渲染缓冲区
-        self.update_render()
+        # 每帧推进的模拟时间 (R_s/c)
+        self.time_step = 1.0
+        
+        # 多波段输出：bands 中的波段与 RGB 共用同一次几何计算
+        self.bands = ()
+        self.display_channel = 'rgb'
+        self.band_stack = None  # (size, size, len(band_names)) float32，与显示图像一样经过抗锯齿
+        self.band_names = ()
+        
+        # 自适应抗锯齿：只对边缘像素做抖动超采样
+        self.antialias = True
+        self.antialiaser = AdaptiveAntialiaser()
+        self.aa_refined_fraction = 0.0
+        
+        # 遥测：最近一帧的阶段耗时与缓存命中，帧序号
+        self.frame_stats = None
+        self.frame_index = 0
+        
+        # 后台渲染线程
+        self._render_pending = False
+        self._render_dirty = False
+        self._pending_dt = 0.0  # 尚未交给后台线程推进的模拟时间
+        self._thread = QThread(self)
+        self._worker = RenderWorker(self)
+        self._worker.moveToThread(self._thread)
+        self.renderRequested.connect(self._worker.render)
+        self._worker.frameReady.connect(self.on_frame_ready)
+        self._thread.start()
+        
+        # 先显示上次缓存的帧，真正的首帧异步渲染
+        self.load_cached_frame()
+        self.request_render()
+    
+    @staticmethod
+    def cache_path():
+        """上一帧缓存文件路径"""
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+        return os.path.join(cache_dir, "last_frame.png")
+    
+    def load_cached_frame(self):
+        """加载上次退出时缓存的帧作为占位图"""
+        path = self.cache_path()
+        if os.path.exists(path):
+            image = QImage(path)
+            if not image.isNull():
+                self.render_image = image
+                timeline.mark("加载缓存帧")
+    
+    def save_cached_frame(self):
+        """缓存当前帧，供下次启动时立即显示"""
+        if self.render_image is None or not self.first_frame_rendered:
+            return
+        path = self.cache_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.render_image.save(path, "PNG")
+        except OSError as e:
+            print(f"缓存渲染帧失败: {str(e)}")
+    
+    def shutdown(self):
+        """停止后台渲染线程并缓存最后一帧"""
+        self._thread.quit()
+        self._thread.wait()
+        self.save_cached_frame()
     
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -37,7 +127,7 @@ class BlackHoleRenderer(QWidget):
         self.draw_starfield(painter)
         
         # 绘制黑洞渲染
-        if self.render_buffer is not None:
+        if self.render_image is not None:
             # 居中绘制
             w, h = self.width(), self.height()
             size = min(w, h) * 0.9
@@ -45,27 +135,26 @@ class BlackHoleRenderer(QWidget):
             y_offset = (h - size) * 0.6
             
             # 抗锯齿缩放
-            painter.save()
-            painter.translate(x_offset, y_offset)
-            painter.scale(size / self.resolution, size / self.resolution)
-            
-            # 绘制每个像素
-            for y in range(self.resolution):
-                for x in range(self.resolution):
-                    r, g, b = self.render_buffer[y][x]
-                    if r > 0 or g > 0 or b > 0:
-                        painter.setPen(QColor(r, g, b))
-                        painter.drawPoint(x, y)
-            
-            painter.restore()
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(QRectF(x_offset, y_offset, size, size), self.render_image)
         
         # 绘制信息文本
         info_text = "黑洞渲染   |   视界半径: {:.1f} km   |   观测角度: {:.0f}°".format(
             self.simulator.schwarzschild_radius, self.view_angle
         )
+        if self.antialias:
+            info_text += "   |   抗锯齿细化: {:.1f}%".format(self.aa_refined_fraction * 100)
+        if not self.first_frame_rendered:
+            info_text += "   |   正在渲染..."
         painter.setPen(QColor(200, 200, 240))
         painter.setFont(self.font())
         painter.drawText(15, self.height() - 15, info_text)
+        painter.end()
+        
+        # 首个真实帧已经画到屏幕上，通知延迟创建的面板
+        if self.first_frame_rendered and not self._first_frame_painted:
+            self._first_frame_painted = True
+            self.firstFramePainted.emit()
     
     def draw_starfield(self, painter):
         """绘制背景星空"""
@@ -90,67 +179,221 @@ class BlackHoleRenderer(QWidget):
             
             # 绘制星星
             painter.setBrush(QBrush(star_color))
-            painter.drawEllipse(x - offset, y - offset, size, size)
+            painter.drawEllipse(QRectF(x - offset, y - offset, size, size))
             
             # 随机辉光
             if np.random.random() > 0.9:
                 painter.setBrush(Qt.NoBrush)
                 painter.setPen(QColor(brightness, brightness, min(255, brightness+50), 80))
-                painter.drawEllipse(x - size*2, y - size*2, size*4, size*4)
+                painter.drawEllipse(QRectF(x - size*2, y - size*2, size*4, size*4))
+    
+    def set_display_channel(self, channel):
+        """选择显示通道：'rgb' 或 modules.bands 中注册的波段名"""
+        self.display_channel = channel
+        self.request_render()
+    
+    def set_bands(self, names):
+        """设置每帧额外输出到 band_stack 的波段（modules.bands 中注册的名称）"""
+        unknown = [name for name in names if name not in BAND_SHADERS]
+        if unknown:
+            raise ValueError(f"未知波段: {', '.join(unknown)}")
+        self.bands = tuple(names)
+        self.request_render()
+    
+    def export_bands(self, path):
+        """把最近一帧的波段堆叠保存为 .npz（stack: (H, W, C) float32, bands: 波段名称）"""
+        stack, names = self.band_stack, self.band_names
+        if stack is None:
+            return False
+        np.savez(path, stack=stack, bands=np.array(names), view_angle=self.view_angle,
+                 sim_time=self.simulator.time)
+        return True
+    
+    def set_antialias(self, enabled):
+        """开启或关闭自适应抗锯齿"""
+        self.antialias = enabled
+        if not enabled:
+            self.aa_refined_fraction = 0.0
+        self.request_render()
     
     def update_simulation(self):
         """当参数变化时更新渲染"""
-        self.generate_render()
-        self.update()
+        self.request_render()
     
     def update_render(self):
-        """更新渲染 - 动画旋转"""
+        """更新渲染 - 动画旋转与吸积盘演化"""
         self.view_angle = (self.view_angle + 0.5) % 360
-        self.generate_render()
+        # 粒子积分在后台线程中、渲染之前进行
+        self._pending_dt += self.time_step
+        self.request_render()
+    
+    def is_rendering(self):
+        """后台线程是否正在渲染"""
+        return self._render_pending
+    
+    def request_render(self):
+        """请求后台线程渲染一帧；若上一帧未完成则合并请求"""
+        if self._render_pending:
+            self._render_dirty = True
+            return
+        self._render_pending = True
+        self._render_dirty = False
+        dt, self._pending_dt = self._pending_dt, 0.0
+        self.renderRequested.emit(self.view_angle, dt)
+    
+    def on_frame_ready(self, buffer):
+        """后台帧完成后更新显示；buffer 为 None 表示渲染失败，保留上一帧"""
+        if buffer is None:
+            self._render_pending = False
+            if self._render_dirty:
+                self.request_render()
+            return
+        start = time.perf_counter()
+        self.render_buffer = buffer
+        self.render_image = self.buffer_to_image(buffer)
+        self._render_pending = False
+        self.frame_index += 1
+        if telemetry.enabled and self.frame_stats is not None:
+            self.record_frame((time.perf_counter() - start) * 1000)
+        
+        if not self.first_frame_rendered:
+            self.first_frame_rendered = True
+            timeline.mark("首帧渲染完成")
+            timeline.report()
+        
         self.update()
+        if self._render_dirty:
+            self.request_render()
+    
+    def record_frame(self, to_image_ms):
+        """把最近一帧的性能数据写入遥测日志"""
+        stats = self.frame_stats
+        stages = dict(stats['stages'], to_image=round(to_image_ms, 3))
+        telemetry.record('frame',
+                         frame=self.frame_index,
+                         view_angle=stats['view_angle'],
+                         sim_time=stats['sim_time'],
+                         param_hash=stats['param_hash'],
+                         resolution=stats['resolution'],
+                         display_channel=stats['display_channel'],
+                         antialias=stats['antialias'],
+                         aa_refined_fraction=round(stats['aa_refined_fraction'], 5),
+                         stages=stages,
+                         total_ms=round(sum(stages.values()), 3),
+                         cache=stats['cache'],
+                         rss_mb=current_rss())
+    
+    @staticmethod
+    def buffer_to_image(buffer):
+        """将RGB缓冲区转换为QImage，黑色像素透明以显示星空"""
+        h, w = buffer.shape[:2]
+        rgba = np.empty((h, w, 4), dtype=np.uint8)
+        rgba[..., :3] = buffer
+        rgba[..., 3] = np.where(buffer.any(axis=2), 255, 0)
+        image = QImage(rgba.data, w, h, 4 * w, QImage.Format_RGBA8888)
+        return image.copy()  # 复制以脱离numpy内存
     
     def generate_render(self):
-        """生成黑洞渲染图像（简化版）"""
+        """生成黑洞渲染图像（同步）"""
+        self.render_buffer = self.compute_frame(self.view_angle)
+        self.render_image = self.buffer_to_image(self.render_buffer)
+        return self.render_buffer
+    
+    def compute_frame(self, view_angle, dt=0.0):
+        """计算指定视角下的黑洞渲染图像（简化版），可在后台线程调用
+        :param dt: 渲染前先把模拟（湍流与粒子）推进的时间 (R_s/c)
+        """
+        timer = StageTimer()
+        if dt > 0:
+            self.simulator.step(dt)
+            timer.lap('step')
+        # 缓存计数按线程累计，这里只统计本线程渲染这一帧时的访问
+        counters = self.simulator.cache_counters()
+        sim_time = self.simulator.time
+        param_hash = params_hash(self.simulator.get_params())
         size = self.resolution
-        self.render_buffer = np.zeros((size, size, 3), dtype=np.uint8)
+        # 界面线程随时可能修改显示设置，本帧只使用开始时读到的值
+        display_channel = self.display_channel
+        antialias = self.antialias
+        bands = self.bands
+        aa_refined_fraction = 0.0
         
         # 旋转角度（弧度）
-        angle = np.radians(self.view_angle)
+        angle = np.radians(view_angle)
         view_cos = cos(angle)
-        view_sin = sin(angle)
         
         # 渲染范围（以事件视界半径为单位）
         schwarz_radius = self.simulator.schwarzschild_radius
         render_radius = self.simulator.accretion_disk_outer_radius * schwarz_radius * self.zoom
         
-        # 渲染每个像素
-        for y in range(size):
-            sy = 2.0 * (y - size/2) / size * render_radius
-            for x in range(size):
-                sx = 2.0 * (x - size/2) / size * render_radius
-                
-                # 应用旋转（围绕y轴）
-                rx = sx * view_cos
-                rz = sx * view_sin  # 旋转轴
-                ry = sy
-                
-                # 模拟引力透镜效应
-                lensed_x, lensed_y, intensity = self.simulator.simulate_gravitational_lens(rx, ry)
-                
-                # 在偏折位置采样吸积盘
-                disk_intensity, disk_color = self.simulator.sample_accretion_disk(lensed_x, lensed_y)
-                
-                # 如果强度大于0，则渲染吸积盘
-                if disk_intensity > 0:
-                    # 添加旋转效果
-                    ri = min(1.0, disk_intensity * intensity)
-                    r = min(255, int(disk_color[0] * ri))
-                    g = min(255, int(disk_color[1] * ri))
-                    b = min(255, int(disk_color[2] * ri))
-                else:
-                    r, g, b = 0, 0, 0
-                
-                # 保存到缓冲区
-                self.render_buffer[y, x] = np.array([r, g, b])
+        # 观察平面坐标（整幅图像一次性计算）
+        coords = 2.0 * (np.arange(size) - size/2) / size * render_radius
+        sx = coords[None, :]
+        sy = coords[:, None]
         
-        return self.render_buffer
+        # 应用旋转（围绕y轴）
+        rx = np.broadcast_to(sx * view_cos, (size, size))
+        ry = np.broadcast_to(sy, (size, size))
+        
+        # 引力透镜几何只计算一次，RGB 与各波段都从中着色
+        geometry = self.simulator.trace_geometry(rx, ry)
+        timer.lap('geometry')
+        if display_channel != 'rgb' and display_channel not in bands:
+            bands = tuple(bands) + (display_channel,)
+        stack = None
+        if bands:
+            stack = shade_bands(self.simulator, geometry, bands)
+            timer.lap('bands')
+        
+        # 自适应抗锯齿：对显示的图像和波段堆叠细化高对比度像素
+        pixel_size = 2.0 * render_radius / size
+        if display_channel != 'rgb':
+            if antialias:
+                aa_refined_fraction = self.antialiaser.refine(
+                    stack, sx, sy, pixel_size,
+                    lambda x, y: shade_bands(self.simulator, self.simulator.trace_geometry(x * view_cos, y), bands))
+                timer.lap('antialias')
+            frame = colorize(stack[..., bands.index(display_channel)])
+            timer.lap('colorize')
+        else:
+            rgb = self.simulator.shade_rgb(geometry)
+            timer.lap('shade')
+            if antialias and stack is not None:
+                # RGB 与波段堆叠合并细化：共用一次边缘检测和同一组抖动光线
+                def shade_all(x, y):
+                    g = self.simulator.trace_geometry(x * view_cos, y)
+                    return np.concatenate([self.simulator.shade_rgb(g), shade_bands(self.simulator, g, bands)], axis=-1)
+                combined = np.concatenate([rgb, stack], axis=-1)
+                aa_refined_fraction = self.antialiaser.refine(combined, sx, sy, pixel_size, shade_all)
+                rgb = combined[..., :3]
+                stack = combined[..., 3:].astype(np.float32)
+                timer.lap('antialias')
+            elif antialias:
+                aa_refined_fraction = self.antialiaser.refine(
+                    rgb, sx, sy, pixel_size, lambda x, y: self.simulator.trace_rays(x * view_cos, y)[0])
+                timer.lap('antialias')
+            
+            # 叠加测试粒子与热斑
+            self.simulator.particles.splat(rgb, self.simulator, view_angle, render_radius)
+            timer.lap('particles')
+            frame = np.minimum(rgb, 255).astype(np.uint8)
+        
+        if stack is not None:
+            self.band_stack, self.band_names = stack, bands
+        self.aa_refined_fraction = aa_refined_fraction
+        
+        # 本帧的性能数据，供遥测日志使用
+        after = self.simulator.cache_counters()
+        self.frame_stats = {
+            'view_angle': view_angle,
+            'sim_time': sim_time,
+            'param_hash': param_hash,
+            'resolution': size,
+            'display_channel': display_channel,
+            'antialias': antialias,
+            'aa_refined_fraction': aa_refined_fraction,
+            'stages': timer.stages,
+            'cache': {name: [after[name][0] - hits, after[name][1] - misses]
+                      for name, (hits, misses) in counters.items()},
+        }
+        return frame
@@ -0,0 +1,150 @@
+import os
+import time
+import argparse
+import cProfile
+import pstats
+import numpy as np
+
+# 无界面回放：没有显示设备时使用 Qt 的离屏平台
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from modules.simulation import BlackHoleSimulator
+from modules.renderer import BlackHoleRenderer
+from modules.telemetry import telemetry, read_log, params_hash
+
+
+class SessionReplay:
+    """遥测会话回放 - 按日志中的事件流重建参数和视角，逐帧重新渲染
+    
+    回放在当前线程中同步调用 BlackHoleRenderer.compute_frame，与 GUI 走同一条渲染路径，
+    因此可以在无界面环境中复现并剖析记录下来的卡顿。
+    """
+    
+    def __init__(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.simulator = BlackHoleSimulator()
+        self.renderer = BlackHoleRenderer(self.simulator)
+        # 停止渲染器自带的后台线程，回放时同步渲染
+        self.renderer.shutdown()
+        self.results = []       # (帧记录, 回放阶段耗时)
+        self.slow_ticks = []
+        self.hash_mismatches = 0
+    
+    def apply(self, record):
+        """应用一条非帧事件"""
+        kind = record.get('kind')
+        renderer = self.renderer
+        if kind in ('session', 'params'):
+            self.simulator.set_params(record['params'])
+        if kind == 'session':
+            renderer.resolution = record.get('resolution', renderer.resolution)
+            renderer.zoom = record.get('zoom', renderer.zoom)
+            renderer.view_angle = record.get('view_angle', renderer.view_angle)
+        if kind in ('session', 'display'):
+            renderer.display_channel = record.get('display_channel', renderer.display_channel)
+            renderer.antialias = record.get('antialias', renderer.antialias)
+        if kind == 'slow_tick':
+            self.slow_ticks.append(record)
+    
+    def render(self, record):
+        """按帧记录推进模拟时间并重新渲染这一帧"""
+        renderer = self.renderer
+        # 与 GUI 相同，在 compute_frame 中推进模拟时间（计入 step 阶段）
+        dt = max(record.get('sim_time', self.simulator.time) - self.simulator.time, 0.0)
+        renderer.resolution = record.get('resolution', renderer.resolution)
+        if params_hash(self.simulator.get_params()) != record.get('param_hash'):
+            self.hash_mismatches += 1
+        
+        renderer.view_angle = record['view_angle']
+        renderer.frame_index = record.get('frame', renderer.frame_index)
+        buffer = renderer.compute_frame(renderer.view_angle, dt)
+        start = time.perf_counter()
+        renderer.render_image = renderer.buffer_to_image(buffer)
+        to_image_ms = (time.perf_counter() - start) * 1000
+        
+        stages = dict(renderer.frame_stats['stages'], to_image=round(to_image_ms, 3))
+        self.results.append((record, stages))
+        if telemetry.enabled:
+            renderer.record_frame(to_image_ms)
+    
+    def run(self, path, limit=None):
+        """回放日志 path 中的全部事件"""
+        frames = 0
+        for record in read_log(path):
+            if record.get('kind') == 'frame':
+                if limit is not None and frames >= limit:
+                    break
+                self.render(record)
+                frames += 1
+            else:
+                self.apply(record)
+        return self.results
+    
+    def report(self, top=10):
+        """打印记录值与回放值的对比"""
+        if not self.results:
+            print("日志中没有帧记录")
+            return
+        recorded = np.array([record.get('total_ms', 0.0) for record, _ in self.results])
+        replayed = np.array([sum(stages.values()) for _, stages in self.results])
+        
+        print(f"回放帧数: {len(self.results)}   参数哈希不一致: {self.hash_mismatches}   "
+              f"记录中的超预算 tick: {len(self.slow_ticks)}")
+        print(f"{'':8}{'平均':>10}{'p50':>10}{'p95':>10}{'最大':>10}  (ms)")
+        for label, values in (("记录", recorded), ("回放", replayed)):
+            p50, p95 = np.percentile(values, [50, 95])
+            print(f"{label:8}{values.mean():10.1f}{p50:10.1f}{p95:10.1f}{values.max():10.1f}")
+        
+        # 各阶段平均耗时
+        names = []
+        for record, stages in self.results:
+            for name in list(record.get('stages', {})) + list(stages):
+                if name not in names:
+                    names.append(name)
+        print(f"\n{'阶段':12}{'记录平均':>10}{'回放平均':>10}  (ms)")
+        for name in names:
+            rec = np.mean([record.get('stages', {}).get(name, 0.0) for record, _ in self.results])
+            rep = np.mean([stages.get(name, 0.0) for _, stages in self.results])
+            print(f"{name:12}{rec:10.2f}{rep:10.2f}")
+        
+        # 记录中最慢的帧
+        print(f"\n记录中最慢的 {min(top, len(self.results))} 帧:")
+        for i in np.argsort(recorded)[::-1][:top]:
+            record, stages = self.results[i]
+            slowest = max(record.get('stages', stages).items(), key=lambda item: item[1])
+            print(f"  帧 {record.get('frame', i):6}  记录 {recorded[i]:7.1f} ms  回放 {replayed[i]:7.1f} ms  "
+                  f"最慢阶段 {slowest[0]} ({slowest[1]:.1f} ms)  视角 {record['view_angle']:.1f}°")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面回放遥测日志，复现并剖析渲染性能")
+    parser.add_argument('log', help="遥测日志路径（自动包含轮转出的 .1, .2 ... 文件）")
+    parser.add_argument('--limit', type=int, default=None, help="最多回放的帧数")
+    parser.add_argument('--top', type=int, default=10, help="列出最慢的帧数")
+    parser.add_argument('--output', default=None, help="把回放得到的逐帧数据写入新的遥测日志")
+    parser.add_argument('--profile', action='store_true', help="用 cProfile 剖析回放过程")
+    args = parser.parse_args(argv)
+    
+    if args.output:
+        telemetry.enable(args.output)
+    replay = SessionReplay()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        replay.run(args.log, args.limit)
+    finally:
+        if profiler:
+            profiler.disable()
+        telemetry.close()
+    
+    replay.report(args.top)
+    if profiler:
+        print()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
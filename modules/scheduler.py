@@ -0,0 +1,157 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, QEvent
+
+from modules.telemetry import telemetry
+
+
+class ScheduledTask:
+    """调度器中的一个周期任务"""
+    
+    def __init__(self, name, callback, interval_ms, priority=0, busy=None, run_when_hidden=False,
+                 visible=None):
+        self.name = name
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.priority = priority          # 数值越大越先执行
+        self.busy = busy                  # 返回True时跳过本次tick（上一帧未完成）
+        self.visible = visible            # 返回False时任务的输出不可见，暂停执行
+        self.run_when_hidden = run_when_hidden
+        self.last_run = 0.0
+        self.runs = 0
+        self.skipped = 0
+        self.idle = 0                     # 因不可见而未执行的次数
+
+
+class FrameScheduler(QObject):
+    """统一帧调度器 - 用一个QTimer按各自频率和优先级驱动所有周期任务
+    
+    窗口失去焦点时降低频率，窗口隐藏、最小化或被遮挡时暂停。
+    """
+    BASE_INTERVAL_MS = 25     # 基础tick间隔
+    UNFOCUSED_FACTOR = 4      # 失去焦点时任务间隔放大倍数
+    HIDDEN_INTERVAL_MS = 1000 # 隐藏时的tick间隔（仅运行run_when_hidden任务）
+    FRAME_BUDGET_MS = 30      # 单次tick时间预算，超出后低优先级任务顺延
+    
+    ACTIVE, UNFOCUSED, HIDDEN = "active", "unfocused", "hidden"
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tasks = []
+        self.state = self.ACTIVE
+        self._window = None
+        self._in_tick = False
+        
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.tick)
+    
+    def register(self, name, callback, interval_ms, priority=0, busy=None, run_when_hidden=False,
+                 visible=None):
+        """注册周期任务"""
+        self.unregister(name)
+        task = ScheduledTask(name, callback, interval_ms, priority, busy, run_when_hidden, visible)
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda t: -t.priority)
+        return task
+    
+    def unregister(self, name):
+        """移除周期任务"""
+        self.tasks = [t for t in self.tasks if t.name != name]
+    
+    def start(self):
+        self.apply_state()
+    
+    def stop(self):
+        self._timer.stop()
+    
+    def watch(self, window):
+        """监听窗口的显示/隐藏/焦点变化"""
+        self._window = window
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if obj is self._window and event.type() in (
+            QEvent.Show, QEvent.Hide, QEvent.WindowStateChange,
+            QEvent.WindowActivate, QEvent.WindowDeactivate
+        ):
+            self.update_state()
+        return False
+    
+    def current_state(self):
+        """根据窗口状态判断调度模式"""
+        window = self._window
+        if window is None:
+            return self.ACTIVE
+        if not window.isVisible() or window.isMinimized():
+            return self.HIDDEN
+        
+        # 平台支持时，窗口被完全遮挡也视为隐藏
+        handle = window.windowHandle()
+        if handle is not None and not handle.isExposed():
+            return self.HIDDEN
+        
+        if not window.isActiveWindow():
+            return self.UNFOCUSED
+        return self.ACTIVE
+    
+    def update_state(self):
+        state = self.current_state()
+        if state != self.state:
+            self.state = state
+            self.apply_state()
+    
+    def apply_state(self):
+        """按当前模式调整tick间隔"""
+        if self.state == self.HIDDEN:
+            # 隐藏时保留低频tick，用于检测窗口恢复可见
+            self._timer.start(self.HIDDEN_INTERVAL_MS)
+        else:
+            self._timer.start(self.BASE_INTERVAL_MS)
+    
+    def tick(self):
+        """执行所有到期的任务"""
+        if self._in_tick:
+            return
+        self._in_tick = True
+        try:
+            # 遮挡状态没有事件通知，每次tick时检查
+            self.update_state()
+            
+            factor = self.UNFOCUSED_FACTOR if self.state == self.UNFOCUSED else 1
+            start = time.perf_counter()
+            top_priority = self.tasks[0].priority if self.tasks else 0
+            durations = {}
+            
+            for task in self.tasks:
+                if self.state == self.HIDDEN and not task.run_when_hidden:
+                    continue
+                
+                now = time.perf_counter()
+                if (now - task.last_run) * 1000 < task.interval_ms * factor:
+                    continue
+                
+                # 任务对应的界面不可见（如未选中的标签页）
+                if task.visible is not None and not task.visible():
+                    task.idle += 1
+                    continue
+                
+                # 上一帧尚未完成，跳过本次
+                if task.busy is not None and task.busy():
+                    task.skipped += 1
+                    continue
+                
+                # 超出本次tick预算，低优先级任务顺延到下一次tick
+                if task.priority < top_priority and (now - start) * 1000 > self.FRAME_BUDGET_MS:
+                    continue
+                
+                task.last_run = now
+                task.runs += 1
+                task.callback()
+                durations[task.name] = round((time.perf_counter() - now) * 1000, 3)
+            
+            # 超出预算的 tick 记入遥测日志，便于事后定位卡顿
+            elapsed = (time.perf_counter() - start) * 1000
+            if elapsed > self.FRAME_BUDGET_MS:
+                telemetry.record('slow_tick', duration_ms=round(elapsed, 3),
+                                 state=self.state, tasks=durations)
+        finally:
+            self._in_tick = False
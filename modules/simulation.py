@@ -1,5 +1,12 @@
 import numpy as np
 import math
+from collections import deque
+
+from modules.turbulence import TurbulenceField
+from modules.particles import ParticleSystem
+from modules.telemetry import CacheCounter
+from modules.observables import ObservablesEngine
+from modules.sweep import parameter_sweep
 
 class BlackHoleSimulator:
     def __init__(self):
@@ -28,9 +35,18 @@ class BlackHoleSimulator:
         self._schwarzschild_radius = None
         self.update_params()
         
-        # 用于监控的数据
-        self.observation_data = []
+        # 用于监控的数据（环形缓冲区）
         self.max_data_points = 500
+        self.observation_data = deque(maxlen=self.max_data_points)
+        self.observables = ObservablesEngine(self)
+        
+        # 时间演化 (时间单位: R_s/c)
+        self.time = 0.0
+        self.turbulence = TurbulenceField()
+        self.particles = ParticleSystem()
+        self._lensing_table = None
+        self._lensing_table_key = None
+        self.lensing_cache = CacheCounter()
     
     @property
     def event_horizon_radius(self):
@@ -48,6 +64,27 @@ class BlackHoleSimulator:
             self._schwarzschild_radius = rs / 1000.0  # 转换为公里
         return self._schwarzschild_radius
     
+    def get_params(self):
+        """当前模拟参数（键与 set_params 相同）"""
+        return {
+            'mass': self.black_hole_mass,
+            'spin': self.spin,
+            'accretion_rate': self.accretion_rate,
+            'disk_inner_radius': self.accretion_disk_inner_radius,
+            'disk_outer_radius': self.accretion_disk_outer_radius,
+            'disk_temp': self.accretion_disk_temp,
+            'disk_turbulence': self.accretion_disk_turbulence,
+            'light_bending': self.light_bending_strength,
+            'doppler_effect': self.doppler_factor,
+        }
+    
+    def cache_counters(self):
+        """各缓存在当前线程中的 (命中, 未命中) 累计次数"""
+        return {
+            'lensing': self.lensing_cache.snapshot(),
+            'turbulence': self.turbulence.cache.snapshot(),
+        }
+    
     def set_params(self, params):
         """更新模拟参数"""
         # 更新主参数
@@ -69,21 +106,33 @@ class BlackHoleSimulator:
     
     def update_params(self):
         """更新计算得到的属性值"""
+        # 清空缓存参数
+        self._event_horizon_radius = None
+        self._schwarzschild_radius = None
+        
         mass_kg = self.black_hole_mass * self.M_sun
         rs = self.schwarzschild_radius * 1000.0  # 转换为米
         
-        # Kerr黑洞的事件视界半径
-        r_plus = rs * (1 + math.sqrt(1 - self.spin**2))
+        # Kerr黑洞的事件视界半径 r+ = GM/c^2 (1 + sqrt(1 - a^2))，GM/c^2 = R_s / 2
+        r_plus = rs / 2 * (1 + math.sqrt(1 - self.spin**2))
         self._event_horizon_radius = r_plus / 1000.0  # 转换为公里
         
         # 更新吸积盘物理属性
         # 吸积盘内半径 (米)
         inner_r = self.accretion_disk_inner_radius * (rs * 1000)
         outer_r = self.accretion_disk_outer_radius * (rs * 1000)
+    
+    def sweep(self, mass=None, spin=None, accretion_rate=None, **kwargs):
+        """在质量/自旋/吸积率数组上批量计算派生量，未给出的参数取当前值
         
-        # 清空缓存参数
-        self._event_horizon_radius = None
-        self._schwarzschild_radius = None
+        其余关键字参数 (chunk_size, processes, out_dir) 见 modules.sweep.parameter_sweep
+        """
+        return parameter_sweep(
+            self.black_hole_mass if mass is None else mass,
+            self.spin if spin is None else spin,
+            self.accretion_rate if accretion_rate is None else accretion_rate,
+            **kwargs
+        )
     
     def simulate_gravitational_lens(self, x, y):
         """
@@ -108,12 +157,12 @@ class BlackHoleSimulator:
         lensed_y = y - deflection_angle * math.sin(theta) * r
         
         # 计算强度 (随距离递减)
-        intensity = 1.0 - math.atan(r / self.accretion_disk_inner_radius) * 0.5
+        intensity = 1.0 - math.atan(r / (self.accretion_disk_inner_radius * self.schwarzschild_radius)) * 0.5
         
         return lensed_x, lensed_y, intensity
     
     def sample_accretion_disk(self, x, y):
-        """在特定点采样吸积盘"""
+        """在特定点采样吸积盘 (x, y 以史瓦西半径为单位)"""
         r = math.sqrt(x*x + y*y)
         
         # 检查是否在吸积盘范围内
@@ -128,8 +177,8 @@ class BlackHoleSimulator:
         
         # 多普勒效应 (假设吸积盘旋转)
         # 靠近黑洞的吸积盘旋转更快
-        angular_velocity = math.sqrt(self.G * self.black_hole_mass * self.M_sun) / (r * 1000)
-        doppler_shift = 1.0 + self.doppler_factor * angular_velocity / self.c * math.sin(math.atan2(y, x))
+        orbital_velocity = math.sqrt(self.G * self.black_hole_mass * self.M_sun / (r * self.schwarzschild_radius * 1000))
+        doppler_shift = 1.0 + self.doppler_factor * orbital_velocity / self.c * math.sin(math.atan2(y, x))
         
         # 温度颜色映射
         # 蓝色=热，红色=较冷
@@ -155,16 +204,177 @@ class BlackHoleSimulator:
         
         return intensity, (red_val, green_val, blue_val)
     
-    def update_monitoring_data(self):
-        """更新用于监控的数据"""
-        self.observation_data.append({
+    def keplerian_angular_velocity(self, r):
+        """开普勒角速度 (单位 c/R_s)，r 以史瓦西半径为单位"""
+        # 几何单位下 R_s = 2GM/c^2 = 1，即 GM = 0.5
+        return np.sqrt(0.5 / np.power(r, 3))
+    
+    def step(self, dt):
+        """推进模拟时间 dt (R_s/c)"""
+        self.time += dt
+        
+        # 湍流场随吸积盘差旋转
+        ring_radii = self.turbulence.ring_radii(self.accretion_disk_inner_radius,
+                                                self.accretion_disk_outer_radius)
+        self.turbulence.advance(dt, self.keplerian_angular_velocity(ring_radii))
+        
+        # 测试粒子与热斑
+        self.particles.step(dt, self.accretion_disk_inner_radius, self.accretion_disk_outer_radius)
+    
+    def lensing_lookup(self, disk_r, table_size=1024):
+        """径向透镜查找表：吸积盘半径 -> 主像在观察平面上的半径
+        :param disk_r: 盘面半径数组 (R_s)
+        :return: (image_r, intensity)，image_r 以 R_s 为单位
+        """
+        key = (self.light_bending_strength, self.schwarzschild_radius,
+               self.accretion_disk_inner_radius, self.accretion_disk_outer_radius)
+        if self._lensing_table_key == key:
+            self.lensing_cache.hit()
+        else:
+            self.lensing_cache.miss()
+            rs = self.schwarzschild_radius
+            deflection = 2 * self.light_bending_strength
+            
+            # 对主像分支正向采样透镜映射，再插值求逆
+            image_r = deflection + np.geomspace(1e-3, 4 * self.accretion_disk_outer_radius, table_size)
+            lensed_x, _, intensity = self.simulate_gravitational_lens_batch(image_r * rs, np.zeros(table_size))
+            self._lensing_table = (np.abs(lensed_x) / rs, image_r, intensity)
+            self._lensing_table_key = key
+        
+        table_disk_r, table_image_r, table_intensity = self._lensing_table
+        return (np.interp(disk_r, table_disk_r, table_image_r),
+                np.interp(disk_r, table_disk_r, table_intensity))
+    
+    def simulate_gravitational_lens_batch(self, x, y):
+        """simulate_gravitational_lens 的向量化版本，x, y 为同形状的数组"""
+        r = np.maximum(np.hypot(x, y), 1e-10)
+        
+        deflection_angle = (self.light_bending_strength * 2 * self.schwarzschild_radius) / r
+        
+        theta = np.arctan2(y, x)
+        lensed_x = x - deflection_angle * np.cos(theta) * r
+        lensed_y = y - deflection_angle * np.sin(theta) * r
+        
+        intensity = 1.0 - np.arctan(r / (self.accretion_disk_inner_radius * self.schwarzschild_radius)) * 0.5
+        
+        return lensed_x, lensed_y, intensity
+    
+    def disk_geometry(self, x, y):
+        """计算吸积盘上一批点的中间量 (x, y 以史瓦西半径为单位)
+        
+        返回的字典供各种着色（RGB 颜色、多波段强度）共享：
+        in_disk, r, phi, temp, ratio, modulation (湍流调制), intensity, doppler
+        """
+        inner = self.accretion_disk_inner_radius
+        outer = self.accretion_disk_outer_radius
+        r = np.hypot(x, y)
+        in_disk = (r >= inner) & (r <= outer)
+        r_safe = np.where(in_disk, r, inner)
+        
+        # 温度分布与辐射强度
+        temp = self.accretion_disk_temp * (inner / r_safe) ** 0.75
+        ratio = temp / self.accretion_disk_temp
+        
+        # 湍流调制辐射强度
+        phi = np.arctan2(y, x)
+        modulation = 1.0
+        if self.accretion_disk_turbulence > 0:
+            r_norm = (r_safe - inner) / max(outer - inner, 1e-10)
+            noise = self.turbulence.sample(r_norm, phi)
+            modulation = np.maximum(0.0, 1.0 + self.accretion_disk_turbulence * noise)
+        intensity = np.where(in_disk, ratio ** 4 * modulation, 0.0)
+        
+        # 多普勒效应
+        orbital_velocity = np.sqrt(self.G * self.black_hole_mass * self.M_sun / (r_safe * self.schwarzschild_radius * 1000))
+        doppler_shift = 1.0 + self.doppler_factor * orbital_velocity / self.c * np.sin(phi)
+        
+        return {
+            'in_disk': in_disk,
+            'r': r_safe,
+            'phi': phi,
+            'temp': temp,
+            'ratio': ratio,
+            'modulation': modulation,
+            'intensity': intensity,
+            'doppler': doppler_shift,
+        }
+    
+    def disk_colors(self, geometry):
+        """按温度和多普勒效应为吸积盘着色，返回形状为 (..., 3) 的 0-255 颜色"""
+        temp = geometry['temp']
+        ratio = geometry['ratio']
+        doppler_shift = geometry['doppler']
+        
+        # 温度颜色映射 (与 sample_accretion_disk 相同的分段)
+        hot = temp > 1e6
+        warm = ~hot & (temp > 3e5)
+        cool_t = temp / (0.3 * self.accretion_disk_temp)
+        half_t = temp / (0.5 * self.accretion_disk_temp)
+        blue = np.select([hot, warm], [255 * ratio, 200 * ratio], 80 * cool_t)
+        green = np.select([hot, warm], [200 * (ratio * 0.6), 150 * (ratio * 1.2)], 120 * half_t)
+        red = np.select([hot, warm], [120 * (ratio * 0.4), 80 * (ratio * 0.8)], 220 * half_t)
+        blue = np.minimum(255, np.trunc(blue))
+        green = np.minimum(255, np.trunc(green))
+        red = np.minimum(255, np.trunc(red))
+        
+        # 应用多普勒效应
+        red = np.minimum(255, np.trunc(red * doppler_shift))
+        blue = np.maximum(0, np.trunc(blue * (2.0 - doppler_shift)))
+        
+        colors = np.stack([red, green, blue], axis=-1)
+        colors[~geometry['in_disk']] = 0
+        return colors
+    
+    def sample_accretion_disk_batch(self, x, y):
+        """sample_accretion_disk 的向量化版本，并叠加动态湍流 (x, y 以史瓦西半径为单位)
+        :return: (intensity, colors)，colors 形状为 x.shape + (3,)
+        """
+        geometry = self.disk_geometry(x, y)
+        return geometry['intensity'], self.disk_colors(geometry)
+    
+    def trace_geometry(self, x, y):
+        """对观察平面上的一批光线 (单位 km) 做透镜偏折，返回吸积盘几何中间量
+        
+        在 disk_geometry 的基础上增加 lens_intensity (透镜强度) 和 weight (亮度权重)，
+        同一组几何量可被 shade_rgb 和 modules.bands 中的各波段着色器共用。
+        """
+        lensed_x, lensed_y, intensity = self.simulate_gravitational_lens_batch(x, y)
+        
+        # 吸积盘半径以史瓦西半径为单位
+        rs = self.schwarzschild_radius
+        geometry = self.disk_geometry(lensed_x / rs, lensed_y / rs)
+        geometry['lens_intensity'] = intensity
+        geometry['weight'] = np.where(geometry['intensity'] > 0,
+                                      np.minimum(1.0, geometry['intensity'] * intensity), 0.0)
+        return geometry
+    
+    def shade_rgb(self, geometry):
+        """由 trace_geometry 的结果生成 0-255 的浮点 RGB 颜色"""
+        weight = geometry['weight']
+        return np.minimum(255, np.trunc(self.disk_colors(geometry) * weight[..., None]))
+    
+    def trace_rays(self, x, y):
+        """对观察平面上的一批光线 (单位 km) 做透镜偏折并采样吸积盘
+        :return: (rgb, weight)，rgb 为 0-255 的浮点颜色，weight 为亮度权重
+        """
+        geometry = self.trace_geometry(x, y)
+        return self.shade_rgb(geometry), geometry['weight']
+    
+    def measure_observables(self, view_angle, zoom=1.0):
+        """计算积分流量、阴影直径和质心偏移，并写入观测数据环"""
+        observation = self.observables.measure(view_angle, zoom)
+        self.update_monitoring_data(observation)
+        return observation
+    
+    def update_monitoring_data(self, observation=None):
+        """更新用于监控的数据（超出 max_data_points 的旧数据自动丢弃）"""
+        record = {
             'radius': self.schwarzschild_radius,
             'mass': self.black_hole_mass,
             'spin': self.spin,
             'accretion_rate': self.accretion_rate,
             'disk_temp': self.accretion_disk_temp
-        })
-        
-        # 限制数据点数量
-        if len(self.observation_data) > self.max_data_points:
-            self.observation_data.pop(0)
+        }
+        if observation is not None:
+            record.update(observation)
+        self.observation_data.append(record)
@@ -0,0 +1,39 @@
+import sys
+import time
+
+
+class StartupTimeline:
+    """记录启动过程中各阶段（导入/初始化/首帧）的时间点"""
+    
+    def __init__(self):
+        self.enabled = False
+        self.t0 = time.perf_counter()
+        self.marks = []
+        self._reported = False
+    
+    def enable(self):
+        self.enabled = True
+    
+    def mark(self, label):
+        """记录一个时间点"""
+        if self.enabled:
+            self.marks.append((label, time.perf_counter()))
+    
+    def report(self, stream=None):
+        """打印启动时间线（只打印一次）"""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        stream = stream or sys.stderr
+        
+        print("启动时间线:", file=stream)
+        print(f"{'累计(ms)':>10} {'增量(ms)':>10}  阶段", file=stream)
+        last = self.t0
+        for label, t in self.marks:
+            print(f"{(t - self.t0) * 1000:10.1f} {(t - last) * 1000:10.1f}  {label}", file=stream)
+            last = t
+        stream.flush()
+
+
+# 全局时间线，供各模块记录
+timeline = StartupTimeline()
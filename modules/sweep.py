@@ -0,0 +1,177 @@
+import os
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# 物理常数（与 BlackHoleSimulator 一致）
+G = 6.67430e-11          # 万有引力常数 (m^3 kg^-1 s^-2)
+C = 299792458.0          # 光速 (m/s)
+M_SUN = 1.989e30         # 太阳质量 (kg)
+SIGMA_SB = 5.670374419e-8  # 斯特藩-玻尔兹曼常数 (W m^-2 K^-4)
+L_EDD_PER_MSUN = 1.26e31   # 每太阳质量的爱丁顿光度 (W)
+
+QUANTITIES = (
+    'schwarzschild_radius',   # 史瓦西半径 (km)
+    'event_horizon_radius',   # 事件视界半径 (km)
+    'isco_radius',            # 顺行最内稳定圆轨道半径 (km)
+    'photon_sphere_radius',   # 顺行赤道光子轨道半径 (km)
+    'shadow_diameter',        # 极向观测者看到的阴影直径 (km)
+    'peak_disk_temp',         # 薄盘峰值温度 (K)
+)
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def derived_quantities(mass, spin, accretion_rate=0.01):
+    """对一组可广播的参数数组计算全部派生量
+    :param mass: 黑洞质量 (M☉)
+    :param spin: 无量纲自旋 (0 - 0.99)
+    :param accretion_rate: 吸积率（以爱丁顿吸积率为单位）
+    :return: {名称: 广播后形状的数组}
+    """
+    mass, a, rate = np.broadcast_arrays(np.asarray(mass, dtype=np.float64),
+                                        np.asarray(spin, dtype=np.float64),
+                                        np.asarray(accretion_rate, dtype=np.float64))
+    mass_kg = mass * M_SUN
+    gravitational_radius = G * mass_kg / C ** 2      # GM/c^2 (m)
+    rs_km = 2 * gravitational_radius / 1000.0
+    half_rs_km = rs_km / 2  # GM/c^2 (km)
+    a2 = a * a
+    
+    # 事件视界 r+ = GM/c^2 (1 + sqrt(1 - a^2))，与 BlackHoleSimulator.update_params 一致
+    horizon_km = half_rs_km * (1 + np.sqrt(1 - a2))
+    
+    # 最内稳定圆轨道 (Bardeen et al. 1972)，单位 GM/c^2
+    z1 = 1 + np.cbrt(1 - a2) * (np.cbrt(1 + a) + np.cbrt(1 - a))
+    z2 = np.sqrt(3 * a2 + z1 * z1)
+    r_isco = 3 + z2 - np.sqrt((3 - z1) * (3 + z1 + 2 * z2))
+    
+    # 顺行赤道光子轨道
+    r_photon = 2 * (1 + np.cos(2.0 / 3.0 * np.arccos(-a)))
+    
+    # 极向观测者的阴影：L_z = 0 的球形光子轨道满足 r^3 - 3r^2 + a^2 r + a^2 = 0，
+    # 阴影半径^2 = η + a^2 = (4r^3 - a^2 (r+1)^2) / (r-1)^2 + a^2
+    r = np.full_like(a, 3.0)
+    for _ in range(30):
+        f = r ** 3 - 3 * r ** 2 + a2 * r + a2
+        df = 3 * r ** 2 - 6 * r + a2
+        r = r - f / df
+    shadow_radius = np.sqrt((4 * r ** 3 - a2 * (r + 1) ** 2) / (r - 1) ** 2 + a2)
+    
+    # 薄盘峰值温度 (Shakura-Sunyaev，内边界取 ISCO，峰值位于 49/36 r_in)
+    efficiency = 1 - np.sqrt(1 - 2 / (3 * r_isco))
+    mdot = rate * L_EDD_PER_MSUN * mass / (efficiency * C ** 2)
+    r_in = r_isco * gravitational_radius
+    peak_temp = (3 * G * mass_kg * mdot / (8 * math.pi * SIGMA_SB * r_in ** 3)
+                 * (36.0 / 49.0) ** 3 / 7.0) ** 0.25
+    
+    return {
+        'schwarzschild_radius': rs_km,
+        'event_horizon_radius': horizon_km,
+        'isco_radius': r_isco * half_rs_km,
+        'photon_sphere_radius': r_photon * half_rs_km,
+        'shadow_diameter': 2 * shadow_radius * half_rs_km,
+        'peak_disk_temp': peak_temp,
+    }
+
+
+def _sweep_chunk(args):
+    """进程池工作函数（需位于模块顶层以便序列化）"""
+    mass, spin, rate = args
+    return derived_quantities(mass, spin, rate)
+
+
+def parameter_sweep(mass, spin, accretion_rate=0.01, chunk_size=DEFAULT_CHUNK_SIZE,
+                    processes=None, out_dir=None):
+    """在广播后的参数网格上一次性计算所有派生量
+    
+    网格按 chunk_size 个点分块计算，避免中间数组占满内存；
+    processes 为进程数时把分块分发到进程池；
+    out_dir 不为空时结果写入 .npy 内存映射文件，可处理大于内存的网格。
+    :return: {名称: 广播后形状的数组}
+    """
+    mass = np.asarray(mass, dtype=np.float64)
+    spin = np.asarray(spin, dtype=np.float64)
+    rate = np.asarray(accretion_rate, dtype=np.float64)
+    shape = np.broadcast_shapes(mass.shape, spin.shape, rate.shape)
+    total = int(np.prod(shape))
+    
+    # 小网格直接计算
+    if total <= chunk_size and processes is None and out_dir is None:
+        return derived_quantities(mass, spin, rate)
+    
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        results = {
+            name: np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode='w+',
+                                            dtype=np.float64, shape=shape)
+            for name in QUANTITIES
+        }
+    else:
+        results = {name: np.empty(shape, dtype=np.float64) for name in QUANTITIES}
+    flat_results = {name: arr.reshape(-1) for name, arr in results.items()}
+    
+    # 标量输入按单点网格分块，结果仍保持 0 维形状
+    grid = shape or (1,)
+    views = [np.broadcast_to(p, grid) for p in (mass, spin, rate)]
+    starts = range(0, total, chunk_size)
+    
+    def chunks():
+        # 只为当前分块取出参数，不展开整个广播网格
+        for start in starts:
+            index = np.unravel_index(np.arange(start, min(start + chunk_size, total)), grid)
+            yield tuple(v[index] for v in views)
+    
+    def store(start, chunk):
+        stop = min(start + chunk_size, total)
+        for name in QUANTITIES:
+            flat_results[name][start:stop] = chunk[name]
+    
+    if processes:
+        # Executor.map 会一次性提交全部分块；这里最多保留 2 × processes 个分块在途，
+        # 保证超大网格在使用进程池时也不会把所有分块的输入同时放进内存
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            window = 2 * processes
+            in_flight = {}
+            for start, args in zip(starts, chunks()):
+                if len(in_flight) >= window:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        store(in_flight.pop(future), future.result())
+                in_flight[pool.submit(_sweep_chunk, args)] = start
+            for future in list(in_flight):
+                store(in_flight.pop(future), future.result())
+    else:
+        for start, args in zip(starts, chunks()):
+            store(start, _sweep_chunk(args))
+    
+    if out_dir is not None:
+        for arr in results.values():
+            arr.flush()
+    return results
+
+
+def grid_axis(spec):
+    """把网格描述转换为一维数组
+    
+    spec 为列表/数组时直接作为取值；为元组时表示 (start, stop, num) 或 (start, stop, num, 'log')
+    """
+    if isinstance(spec, tuple):
+        start, stop, num = spec[:3]
+        if len(spec) == 4 and spec[3] == 'log':
+            return np.geomspace(start, stop, int(num))
+        return np.linspace(start, stop, int(num))
+    return np.atleast_1d(np.asarray(spec, dtype=np.float64))
+
+
+def sweep_grid(mass, spin, accretion_rate=0.01, **kwargs):
+    """按网格描述生成质量 × 自旋 × 吸积率的完整网格并计算派生量
+    
+    例: sweep_grid(mass=(1e4, 1e10, 200, 'log'), spin=(0.0, 0.99, 100))
+    :return: 派生量字典，另含 'mass', 'spin', 'accretion_rate' 三个网格坐标轴
+    """
+    axes = [grid_axis(mass), grid_axis(spin), grid_axis(accretion_rate)]
+    m, s, r = np.meshgrid(*axes, indexing='ij', sparse=True)
+    results = parameter_sweep(m, s, r, **kwargs)
+    results.update({'mass': axes[0], 'spin': axes[1], 'accretion_rate': axes[2]})
+    return results
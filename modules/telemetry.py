@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import threading
+
+# 后台线程的结束标记
+_STOP = object()
+
+
+def params_hash(params):
+    """参数字典的短哈希，用于把帧记录与参数变化对应起来"""
+    text = json.dumps(params, sort_keys=True, default=float)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def current_rss():
+    """当前进程的常驻内存 (MB)；不支持时返回峰值常驻内存或 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageTimer:
+    """逐阶段计时：每次 lap(name) 记录距上一次 lap 的耗时 (毫秒)"""
+    
+    def __init__(self):
+        self.stages = {}
+        self._last = time.perf_counter()
+    
+    def lap(self, name):
+        now = time.perf_counter()
+        self.stages[name] = round((now - self._last) * 1000, 3)
+        self._last = now
+    
+    def total(self):
+        return round(sum(self.stages.values()), 3)
+
+
+class CacheCounter:
+    """缓存命中/未命中计数，按线程分别累计
+    
+    同一个模拟器会被界面线程（观测量）、渲染线程和多视角线程共用，
+    各线程只读到自己的计数，逐帧差值不会混入其他线程的访问。
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def _counts(self):
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = [0, 0]
+        return counts
+    
+    def hit(self):
+        self._counts()[0] += 1
+    
+    def miss(self):
+        self._counts()[1] += 1
+    
+    def snapshot(self):
+        """当前线程的 (命中, 未命中) 累计次数"""
+        return tuple(self._counts())
+
+
+class TelemetryLog:
+    """性能遥测日志 - 以 JSON Lines 格式记录逐帧性能数据和参数变化事件
+    
+    默认关闭；enable() 之后 record() 只把记录放入队列，由后台线程
+    批量写入并定期刷新，不阻塞界面线程。文件超过 max_bytes 时轮转为
+    path.1, path.2, ...（最多保留 backups 个旧文件）；每个新文件开头写入一条
+    session 快照，旧文件被删除后日志仍可独立回放。
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.max_bytes = 0
+        self.backups = 0
+        self.flush_interval = 1.0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._file = None
+        self._state = {}  # 由已写入的记录累积出的当前会话状态（仅后台线程访问）
+    
+    def enable(self, path, max_bytes=16 << 20, backups=3, flush_interval=1.0):
+        """开始记录到 path"""
+        if self.enabled:
+            return
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        self.enabled = True
+    
+    def record(self, kind, **fields):
+        """追加一条记录（线程安全，未启用时直接返回）"""
+        if self.enabled:
+            self._queue.put({'kind': kind, 'timestamp': time.time(), **fields})
+    
+    def close(self):
+        """写完队列中剩余的记录并停止后台线程"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+    
+    def _run(self):
+        """后台线程：写入记录，空闲时刷新到磁盘"""
+        dirty = False
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if dirty:
+                    self._file.flush()
+                    dirty = False
+                continue
+            if item is _STOP:
+                break
+            try:
+                self._file.write(json.dumps(item, ensure_ascii=False, default=float) + '\n')
+                dirty = True
+                self._track(item)
+                if self.max_bytes and self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except (OSError, TypeError, ValueError) as e:
+                print(f"写入遥测日志失败: {str(e)}")
+        self._file.close()
+        self._file = None
+    
+    def _track(self, item):
+        """用一条记录更新会话状态快照"""
+        kind = item['kind']
+        state = self._state
+        if kind == 'session':
+            state.clear()
+            state.update((name, value) for name, value in item.items() if name not in ('kind', 'timestamp'))
+            state['params'] = dict(item.get('params', {}))
+        elif not state:
+            return  # 会话记录之前的事件无法构成完整快照
+        elif kind == 'params':
+            state['params'].update(item['params'])
+            state['param_hash'] = item.get('param_hash', state.get('param_hash'))
+        elif kind == 'display':
+            state['display_channel'] = item.get('display_channel', state.get('display_channel'))
+            state['antialias'] = item.get('antialias', state.get('antialias'))
+        elif kind == 'frame':
+            for name in ('view_angle', 'resolution', 'param_hash'):
+                if name in item:
+                    state[name] = item[name]
+    
+    def _rotate(self):
+        """轮转日志文件：path -> path.1 -> path.2 ..."""
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._state:
+            snapshot = {'kind': 'session', 'timestamp': time.time(), **self._state,
+                        'params': dict(self._state['params']), 'rotated': True}
+            self._file.write(json.dumps(snapshot, ensure_ascii=False, default=float) + '\n')
+
+
+def log_files(path):
+    """按时间顺序列出一个遥测日志的全部文件（最旧的轮转文件在前）"""
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    files = rotated[::-1]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_log(path):
+    """按时间顺序逐条读取遥测日志记录"""
+    for name in log_files(path):
+        with open(name, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # 进程异常退出时最后一行可能不完整
+
+
+# 全局遥测日志，供各模块记录
+telemetry = TelemetryLog()
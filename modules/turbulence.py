@@ -0,0 +1,97 @@
+import numpy as np
+from math import pi
+
+from modules.telemetry import CacheCounter
+
+
+class TurbulenceField:
+    """吸积盘湍流场
+    
+    在归一化的 (r, φ) 网格上一次性预计算可平铺的多倍频值噪声，
+    之后每帧只按各半径处的开普勒角速度对噪声做整数平移（差旋转），
+    避免逐像素计算程序噪声。
+    """
+    
+    def __init__(self, n_r=64, n_phi=256, octaves=4, persistence=0.5, seed=2011):
+        self.n_r = n_r
+        self.n_phi = n_phi
+        
+        rng = np.random.default_rng(seed)
+        self.noise = self.build_noise(n_r, n_phi, octaves, persistence, rng)
+        
+        # 每个半径环累计转过的角度 (弧度)
+        self.phase = np.zeros(n_r)
+        self._frame = self.noise
+        self._frame_shift = np.zeros(n_r, dtype=np.int64)
+        
+        # 当前帧纹理缓存的命中/未命中次数
+        self.cache = CacheCounter()
+    
+    @staticmethod
+    def build_noise(n_r, n_phi, octaves, persistence, rng):
+        """生成在 r 和 φ 方向都可平铺的多倍频值噪声，取值范围 [-1, 1]"""
+        total = np.zeros((n_r, n_phi), dtype=np.float64)
+        amplitude = 1.0
+        cells_r, cells_phi = 4, 16
+        
+        for _ in range(octaves):
+            lattice = rng.uniform(-1.0, 1.0, (cells_r, cells_phi))
+            total += amplitude * TurbulenceField._periodic_interp(lattice, n_r, n_phi)
+            amplitude *= persistence
+            cells_r = min(cells_r * 2, n_r)
+            cells_phi = min(cells_phi * 2, n_phi)
+        
+        total /= np.abs(total).max()
+        return total.astype(np.float32)
+    
+    @staticmethod
+    def _periodic_interp(lattice, n_r, n_phi):
+        """用平滑插值把格点随机值周期性地放大到 (n_r, n_phi)"""
+        cells_r, cells_phi = lattice.shape
+        
+        def axis_weights(n, cells):
+            u = np.arange(n) * cells / n
+            i0 = np.floor(u).astype(np.int64) % cells
+            i1 = (i0 + 1) % cells
+            t = u - np.floor(u)
+            t = t * t * (3.0 - 2.0 * t)  # smoothstep
+            return i0, i1, t
+        
+        r0, r1, tr = axis_weights(n_r, cells_r)
+        p0, p1, tp = axis_weights(n_phi, cells_phi)
+        tr = tr[:, None]
+        tp = tp[None, :]
+        
+        top = lattice[r0][:, p0] * (1 - tp) + lattice[r0][:, p1] * tp
+        bottom = lattice[r1][:, p0] * (1 - tp) + lattice[r1][:, p1] * tp
+        return top * (1 - tr) + bottom * tr
+    
+    def ring_radii(self, inner_radius, outer_radius):
+        """各半径环中心对应的实际半径"""
+        return inner_radius + (outer_radius - inner_radius) * (np.arange(self.n_r) + 0.5) / self.n_r
+    
+    def advance(self, dt, angular_velocity):
+        """按角速度 angular_velocity（长度为 n_r 的数组）推进 dt 时间"""
+        self.phase = (self.phase + angular_velocity * dt) % (2 * pi)
+    
+    def current(self):
+        """当前时刻的噪声纹理：每个半径环按累计角度做循环平移"""
+        shift = np.rint(self.phase / (2 * pi) * self.n_phi).astype(np.int64) % self.n_phi
+        if np.array_equal(shift, self._frame_shift):
+            self.cache.hit()
+            return self._frame
+        self.cache.miss()
+        cols = (np.arange(self.n_phi)[None, :] - shift[:, None]) % self.n_phi
+        self._frame = np.take_along_axis(self.noise, cols, axis=1)
+        self._frame_shift = shift
+        return self._frame
+    
+    def sample(self, r_norm, phi):
+        """采样当前噪声
+        :param r_norm: 归一化半径 (0 - 1，对应内半径到外半径)
+        :param phi: 方位角 (弧度)
+        """
+        frame = self.current()
+        ri = np.clip((r_norm * self.n_r).astype(np.int64), 0, self.n_r - 1)
+        pi_idx = np.floor(phi / (2 * pi) * self.n_phi).astype(np.int64) % self.n_phi
+        return frame[ri, pi_idx]